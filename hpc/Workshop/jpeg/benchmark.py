@@ -27,6 +27,25 @@ implementaciones = [
     ("MPI (PNG)", "mpiexec -n 7 python scripts/mpi_png.py"),
     ("MPI (NEF)", "mpiexec -n 8 python scripts/mpi_raw.py"),
     ("MPI (PNG)", "mpiexec -n 8 python scripts/mpi_png.py"),
+    # 1-D row bands vs 2-D Cartesian tiles (same process count)
+    ("MPI filas n=4 (NEF)", "mpiexec -n 4 python scripts/mpi_raw.py"),
+    ("MPI teselas n=4 (NEF)", "mpiexec -n 4 python scripts/mpi_raw.py --tiles"),
+    ("MPI filas n=8 (NEF)", "mpiexec -n 8 python scripts/mpi_raw.py"),
+    ("MPI teselas n=8 (NEF)", "mpiexec -n 8 python scripts/mpi_raw.py --tiles"),
+    # Hybrid: ranks x Numba threads per rank on the same 8 cores. Open MPI
+    # binds each rank to one core when np <= 2, so unbind them or a rank's
+    # threads would all share that core
+    ("MPI híbrido 8x1 (NEF)", "mpiexec --bind-to none -n 8 python scripts/mpi_raw.py --numba --threads 1"),
+    ("MPI híbrido 2x4 (NEF)", "mpiexec --bind-to none -n 2 python scripts/mpi_raw.py --numba --threads 4"),
+    ("MPI híbrido 1x8 (NEF)", "mpiexec --bind-to none -n 1 python scripts/mpi_raw.py --numba --threads 8"),
+    # Output written by all ranks with MPI-IO instead of saved on rank 0
+    ("MPI-IO PPM n=4 (NEF)", "mpiexec -n 4 python scripts/mpi_raw.py --mpiio"),
+    ("MPI-IO JPEG n=4 (NEF)", "mpiexec -n 4 python scripts/mpi_raw.py --mpiio --encode"),
+    # Task farm over a directory: one image per worker, no pixel traffic
+    ("MPI lote n=2 (images/)", "mpiexec -n 2 python scripts/mpi_batch.py images outputs/batch"),
+    ("MPI lote n=4 (images/)", "mpiexec -n 4 python scripts/mpi_batch.py images outputs/batch"),
+    # Streaming OpenCL batch: decode, kernels and save overlapped across images
+    ("OpenCL lote (images/)", "python scripts/opencl_batch.py images outputs/batch_opencl"),
 ]
 
 def run_command(cmd):
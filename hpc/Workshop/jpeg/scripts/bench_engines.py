@@ -0,0 +1,43 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from jpegcore import Q_Y, get_backend, load_image, pad_image, rgb_to_ycbcr
+
+# In-process DCT engine benchmark: times process_channel on the luma channel
+# only, so imports, JIT compilation and image decoding are excluded.
+# Multiplies per 8x8 block (forward + inverse, excluding quantization):
+#   matrix: 2 * 16 * 64 = 2048    aan: 2 * 16 * 5 = 160
+ENGINES = [
+    ("numpy", "matrix"),
+    ("numpy", "aan"),
+    ("numba", "matrix"),
+    ("numba", "aan"),
+]
+
+
+def benchmark_engine(channel, backend, engine, reps=5):
+    engine = get_backend(backend, engine=engine)
+    engine.process_channel(channel, Q_Y)  # warm-up (JIT compile)
+    tiempos = []
+    for _ in range(reps):
+        start = time.perf_counter()
+        engine.process_channel(channel, Q_Y)
+        tiempos.append(time.perf_counter() - start)
+    return np.array(tiempos)
+
+
+def main(path=Path("images/image.nef"), reps=5):
+    Y, _, _ = rgb_to_ycbcr(load_image(path))
+    Y_padded, h, w = pad_image(Y)
+    print(f"Luma channel {h}x{w}, {reps} repetitions")
+    for backend, engine in ENGINES:
+        tiempos = benchmark_engine(Y_padded, backend, engine, reps)
+        print(f"  {backend:6s} {engine:7s} media: {tiempos.mean():.4f} s  "
+              f"desviación estándar: {tiempos.std():.4f} s")
+
+
+if __name__ == "__main__":
+    main(Path(sys.argv[1]) if len(sys.argv) > 1 else Path("images/image.nef"))
@@ -0,0 +1,8 @@
+from pathlib import Path
+
+from jpegcore import encode_file
+
+# Real JPEG output: DCT + quantization on the NumPy backend, then zigzag,
+# run-length and Huffman coding straight to a .jpg (no IDCT, no PIL encode)
+if __name__ == "__main__":
+    encode_file(Path("images/gato.png"), Path("outputs/encoded_png.jpg"), backend="numpy", quality=50)
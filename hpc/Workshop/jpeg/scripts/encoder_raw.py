@@ -0,0 +1,8 @@
+from pathlib import Path
+
+from jpegcore import encode_file
+
+# Real JPEG output: DCT + quantization on the NumPy backend, then zigzag,
+# run-length and Huffman coding straight to a .jpg (no IDCT, no PIL encode)
+if __name__ == "__main__":
+    encode_file(Path("images/image.nef"), Path("outputs/encoded_raw.jpg"), backend="numpy", quality=50)
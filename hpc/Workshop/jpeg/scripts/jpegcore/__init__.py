@@ -0,0 +1,23 @@
+"""Shared JPEG pipeline stages and pluggable compression backends.
+
+    from jpegcore import compress, load_image
+    rgb_out = compress(load_image("images/gato.png"), backend="numba")
+"""
+
+from .backends import BACKENDS, Backend, get_backend, register_backend
+from .blocks import pad_image
+from .chroma import SUBSAMPLING
+from .color import rgb_to_ycbcr, rgb_to_ycbcr_fixed, ycbcr_to_rgb, ycbcr_to_rgb_fixed
+from .dct import dct_matrix
+from .io import find_images, load_image, load_png_image, load_raw_image, save_image
+from .pipeline import compress, compress_file, compress_files, encode_file, encode_jpeg
+from .quant import Q_C, Q_Y, expand_quant_matrix, quant_tables, scale_quant_matrix
+
+__all__ = [
+    "BACKENDS", "Backend", "get_backend", "register_backend",
+    "pad_image", "SUBSAMPLING", "rgb_to_ycbcr", "ycbcr_to_rgb",
+    "rgb_to_ycbcr_fixed", "ycbcr_to_rgb_fixed", "dct_matrix",
+    "find_images", "load_image", "load_png_image", "load_raw_image", "save_image",
+    "compress", "compress_file", "compress_files", "encode_file", "encode_jpeg",
+    "Q_C", "Q_Y", "expand_quant_matrix", "quant_tables", "scale_quant_matrix",
+]
@@ -0,0 +1,118 @@
+import numpy as np
+
+# ---------- Arai-Agui-Nakajima 8-point DCT (IJG jfdctflt.c / jidctflt.c) ----------
+# The 1-D AAN transform costs 5 multiplies instead of 64. Its outputs are
+# scaled by AAN_SCALE[u] * AAN_SCALE[v] * 8 relative to the orthonormal DCT,
+# so the scale is folded into the quantization tables instead of the data.
+AAN_SCALE = np.array([1.0] + [np.cos(k * np.pi / 16) * np.sqrt(2) for k in range(1, 8)])
+
+_c2, _c4, _c6 = (np.cos(k * np.pi / 16) for k in (2, 4, 6))
+C4 = _c4                        # 0.707106781
+C6 = _c6                        # 0.382683433
+C6_S2 = _c6 * np.sqrt(2)        # 0.541196100
+C2_S2 = _c2 * np.sqrt(2)        # 1.306562965
+SQRT2 = np.sqrt(2)              # 1.414213562
+C2_2 = 2 * _c2                  # 1.847759065
+I1 = 2 * (_c2 - _c6)            # 1.082392200
+I2 = 2 * (_c2 + _c6)            # 2.613125930
+
+
+def aan_quant_tables(Q):
+    # Forward divisor and inverse multiplier with the AAN scaling folded in
+    scale = np.outer(AAN_SCALE, AAN_SCALE)
+    return Q * scale * 8.0, Q * scale / 8.0
+
+
+def _fdct_1d(d):
+    # d: (8, ...) float array, transformed along the first axis
+    d0, d1, d2, d3, d4, d5, d6, d7 = d
+    tmp0 = d0 + d7
+    tmp7 = d0 - d7
+    tmp1 = d1 + d6
+    tmp6 = d1 - d6
+    tmp2 = d2 + d5
+    tmp5 = d2 - d5
+    tmp3 = d3 + d4
+    tmp4 = d3 - d4
+
+    # Even part
+    tmp10 = tmp0 + tmp3
+    tmp13 = tmp0 - tmp3
+    tmp11 = tmp1 + tmp2
+    tmp12 = tmp1 - tmp2
+    out = np.empty_like(d)
+    out[0] = tmp10 + tmp11
+    out[4] = tmp10 - tmp11
+    z1 = (tmp12 + tmp13) * C4
+    out[2] = tmp13 + z1
+    out[6] = tmp13 - z1
+
+    # Odd part
+    tmp10 = tmp4 + tmp5
+    tmp11 = tmp5 + tmp6
+    tmp12 = tmp6 + tmp7
+    z5 = (tmp10 - tmp12) * C6
+    z2 = C6_S2 * tmp10 + z5
+    z4 = C2_S2 * tmp12 + z5
+    z3 = tmp11 * C4
+    z11 = tmp7 + z3
+    z13 = tmp7 - z3
+    out[5] = z13 + z2
+    out[3] = z13 - z2
+    out[1] = z11 + z4
+    out[7] = z11 - z4
+    return out
+
+
+def _idct_1d(c):
+    # c: (8, ...) dequantized, AAN-scaled coefficients along the first axis
+    # Even part
+    tmp10 = c[0] + c[4]
+    tmp11 = c[0] - c[4]
+    tmp13 = c[2] + c[6]
+    tmp12 = (c[2] - c[6]) * SQRT2 - tmp13
+    tmp0 = tmp10 + tmp13
+    tmp3 = tmp10 - tmp13
+    tmp1 = tmp11 + tmp12
+    tmp2 = tmp11 - tmp12
+
+    # Odd part
+    z13 = c[5] + c[3]
+    z10 = c[5] - c[3]
+    z11 = c[1] + c[7]
+    z12 = c[1] - c[7]
+    tmp7 = z11 + z13
+    tmp11 = (z11 - z13) * SQRT2
+    z5 = (z10 + z12) * C2_2
+    tmp10 = I1 * z12 - z5
+    tmp12 = -I2 * z10 + z5
+    tmp6 = tmp12 - tmp7
+    tmp5 = tmp11 - tmp6
+    tmp4 = tmp10 + tmp5
+
+    out = np.empty_like(c)
+    out[0] = tmp0 + tmp7
+    out[7] = tmp0 - tmp7
+    out[1] = tmp1 + tmp6
+    out[6] = tmp1 - tmp6
+    out[2] = tmp2 + tmp5
+    out[5] = tmp2 - tmp5
+    out[4] = tmp3 + tmp4
+    out[3] = tmp3 - tmp4
+    return out
+
+
+# ---------- Batched AAN transform over a (H/8, W/8, 8, 8) tensor ----------
+# The butterflies run on (8, 8, H/8, W/8) copies, so every d[k] they touch is
+# a contiguous plane holding one coefficient position of all blocks.
+def aan_dct_quant_blocks(blocks, fwd_divisors):
+    X = np.moveaxis(blocks, (2, 3), (0, 1)) - np.float64(128)
+    X = _fdct_1d(_fdct_1d(X).swapaxes(0, 1)).swapaxes(0, 1)
+    quantized = np.round(X / fwd_divisors[:, :, None, None])
+    return np.moveaxis(quantized, (0, 1), (2, 3))
+
+
+def aan_idct_dequant_blocks(quantized, inv_multipliers):
+    X = np.moveaxis(quantized, (2, 3), (0, 1)) * inv_multipliers[:, :, None, None]
+    X = _idct_1d(_idct_1d(X).swapaxes(0, 1)).swapaxes(0, 1)
+    return np.moveaxis(X + 128, (0, 1), (2, 3))
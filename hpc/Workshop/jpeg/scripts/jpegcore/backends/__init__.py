@@ -0,0 +1,43 @@
+import importlib
+
+from .base import Backend
+
+# name -> (module, class). Relative module names resolve inside this package;
+# modules are imported on first use so numba, mpi4py and pyopencl stay optional
+BACKENDS = {
+    "numpy": (".numpy_backend", "NumpyBackend"),
+    "numba": (".numba_backend", "NumbaBackend"),
+    "mpi": (".mpi_backend", "MPIBackend"),
+    "opencl": (".opencl_backend", "OpenCLBackend"),
+}
+
+_instances = {}
+
+
+def _option_key(value):
+    # Communicators and contexts are not hashable; key them by identity
+    try:
+        hash(value)
+    except TypeError:
+        return id(value)
+    return value
+
+
+def register_backend(name, module, class_name):
+    BACKENDS[name] = (module, class_name)
+
+
+def get_backend(name="numpy", **options):
+    if isinstance(name, Backend):
+        return name
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}, choose from {sorted(BACKENDS)}")
+    key = (name, tuple(sorted((k, _option_key(v)) for k, v in options.items())))
+    if key not in _instances:
+        module, class_name = BACKENDS[name]
+        module = importlib.import_module(module, __name__)
+        _instances[key] = getattr(module, class_name)(**options)
+    return _instances[key]
+
+
+__all__ = ["Backend", "BACKENDS", "get_backend", "register_backend"]
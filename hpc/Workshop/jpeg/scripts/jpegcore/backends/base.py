@@ -0,0 +1,47 @@
+import numpy as np
+
+from ..blocks import blockify
+from ..chroma import downsample, upsample
+from ..color import (rgb_to_ycbcr, rgb_to_ycbcr_fixed, to_samples, ycbcr_to_rgb,
+                     ycbcr_to_rgb_fixed)
+from ..dct import dct_matrix, dct_quant_blocks
+
+
+class Backend:
+    """Per-channel DCT -> quantize -> dequantize -> IDCT engine.
+
+    Instances are created once through get_backend() and reused across
+    compress() calls, so anything expensive (JIT compilation, OpenCL
+    context and program builds) belongs in __init__ or is cached on self.
+    """
+
+    name = None
+
+    def process_channel(self, channel, Q, block_size=8):
+        # channel: 2-D float array padded to a multiple of block_size
+        # returns the reconstructed channel with the same shape
+        raise NotImplementedError
+
+    def quantize_channel(self, channel, Q, block_size=8):
+        # Forward half only, for the entropy coder: (H/b, W/b, b, b)
+        # quantized coefficients. Backends override this with their own kernels.
+        return dct_quant_blocks(blockify(channel, block_size), Q, dct_matrix(block_size))
+
+    def rgb_to_ycbcr(self, image, fixed_point=False):
+        # fixed_point: uint8 in, uint8 planes out, integer arithmetic only
+        if fixed_point:
+            return rgb_to_ycbcr_fixed(np.asarray(image, dtype=np.uint8))
+        return rgb_to_ycbcr(image)
+
+    def downsample(self, channel, fx, fy):
+        # Chroma subsampling stage: (h, w) -> (ceil(h/fy), ceil(w/fx))
+        return downsample(channel, fx, fy)
+
+    def upsample(self, channel, fx, fy, h, w):
+        # Inverse of downsample, cropped back to (h, w)
+        return upsample(channel, fx, fy, h, w)
+
+    def ycbcr_to_rgb(self, Y, Cb, Cr, fixed_point=False):
+        if fixed_point:
+            return ycbcr_to_rgb_fixed(to_samples(Y), to_samples(Cb), to_samples(Cr))
+        return ycbcr_to_rgb(Y, Cb, Cr)
@@ -0,0 +1,518 @@
+from pathlib import Path
+
+import numpy as np
+from mpi4py import MPI
+
+from .. import pipeline
+from ..chroma import subsampling_factors
+from ..entropy import optimal_tables
+from ..jfif import (EOI, STANDARD_TABLES, check_restart_rows, jfif_header, join_segments,
+                    max_restart_rows, pack_segments, scan_segments, segments_histogram,
+                    to_zigzag)
+from ..partition import chunk_bounds, stripe_bounds
+from ..quant import quant_tables
+from ..timing import phase
+from . import get_backend
+from .base import Backend
+
+# Message tags of the dynamic (work-queue) schedule
+TAG_WORK, TAG_STOP, TAG_DONE, TAG_DATA = 1, 2, 3, 4
+
+
+class MPIBackend(Backend):
+    """Row-band decomposition over comm; every rank must make the same calls.
+
+    Images and channels are held on rank 0 only (pass None elsewhere).
+    Rank 0 Scatterv's a band of whole block rows to each rank, the ranks
+    transform their band on the `local` backend and the results are
+    Gatherv'd back, so per-rank memory and traffic scale as 1/P. Results
+    are returned on rank 0, None on the other ranks. local="numba" with
+    threads=N runs each band on N threads (hybrid MPI + threads).
+
+    schedule="static" gives each rank one band with balanced stripe counts.
+    schedule="dynamic" turns rank 0 into a dispatcher handing out chunks
+    of chunk_stripes stripes on demand (default: about four per worker),
+    so faster nodes take more chunks; rank 0 then does no transforms.
+
+    decomposition="tiles" splits along both axes instead: the ranks form a
+    Cartesian grid (Create_cart, dims from MPI.Compute_dims unless given as
+    tile_dims=(rows, cols)) and each takes one block-aligned tile, which
+    keeps the working set small on images much wider than tall.
+
+    overlap_steps=N (row bands, static schedule) cuts every band into N
+    sub-bands and pipelines them with nonblocking collectives: sub-band k+1
+    is scattered (Iscatterv) and finished sub-bands are streamed to rank 0
+    (Igatherv) while sub-band k is transformed.
+
+    shared=True stores the frame once per node instead: the ranks of a node
+    (Split_type COMM_TYPE_SHARED) map one MPI shared-memory window holding
+    it, transform views of their own band or tile in place and write into a
+    shared output window, so nothing is scattered within a node. Only the
+    node leaders exchange data (a Bcast of the frame, a Reduce of the result).
+    """
+
+    name = "mpi"
+
+    def __init__(self, comm=None, local="numpy", schedule="static", chunk_stripes=None,
+                 decomposition="rows", tile_dims=None, overlap_steps=0, threads=None,
+                 shared=False):
+        if schedule not in ("static", "dynamic"):
+            raise ValueError(f"Unknown schedule {schedule!r}, choose 'static' or 'dynamic'")
+        if decomposition not in ("rows", "tiles"):
+            raise ValueError(f"Unknown decomposition {decomposition!r}, choose 'rows' or 'tiles'")
+        if decomposition == "tiles" and schedule == "dynamic":
+            raise ValueError("decomposition='tiles' uses the static schedule")
+        if shared and schedule == "dynamic":
+            raise ValueError("shared=True uses the static schedule")
+        self.comm = comm if comm is not None else MPI.COMM_WORLD
+        self.rank = self.comm.Get_rank()
+        self.size = self.comm.Get_size()
+        # Hybrid runs: `threads` per rank for the local numpy/numba kernels,
+        # independent of the number of ranks (e.g. one rank per node)
+        self.local = get_backend(local) if threads is None else get_backend(local, threads=threads)
+        self.schedule = schedule
+        self.chunk_stripes = chunk_stripes
+        self.decomposition = decomposition
+        self.overlap_steps = overlap_steps
+        if decomposition == "tiles":
+            self.dims = list(tile_dims or MPI.Compute_dims(self.size, 2))
+            # reorder=False keeps cart ranks equal to comm ranks (rank 0 is root)
+            self.cart = self.comm.Create_cart(self.dims, reorder=False)
+        self.shared = shared
+        if shared:
+            # Ranks sharing a node's memory; the first of each node (rank 0
+            # included, key=rank) also joins the leaders communicator
+            self.node = self.comm.Split_type(MPI.COMM_TYPE_SHARED, key=self.rank)
+            leader = self.node.Get_rank() == 0
+            self.leaders = self.comm.Split(0 if leader else MPI.UNDEFINED, self.rank)
+
+    # ---------- Row-band decomposition ----------
+    def _header(self, array):
+        # Shape and dtype of the array held on rank 0, on every rank
+        header = (array.shape, array.dtype.str) if self.rank == 0 else None
+        with phase("comm"):
+            shape, dtype = self.comm.bcast(header, root=0)
+        return shape, np.dtype(dtype)
+
+    def row_bounds(self, h, unit):
+        # Rank r owns rows bounds[r]:bounds[r+1]
+        return stripe_bounds(h, unit, self.size)
+
+    def _counts(self, bounds, row_size):
+        return (np.diff(bounds) * row_size).tolist(), (bounds[:-1] * row_size).tolist()
+
+    def scatter_rows(self, array, bounds, shape, dtype):
+        row_size = int(np.prod(shape[1:]))
+        band = np.empty((bounds[self.rank + 1] - bounds[self.rank],) + tuple(shape[1:]), dtype)
+        send = None
+        if self.rank == 0:
+            send = [np.ascontiguousarray(array), self._counts(bounds, row_size)]
+        with phase("comm"):
+            self.comm.Scatterv(send, band, root=0)
+        return band
+
+    def gather_rows(self, band, bounds):
+        row_size = int(np.prod(band.shape[1:]))
+        out = recv = None
+        if self.rank == 0:
+            out = np.empty((bounds[-1],) + band.shape[1:], band.dtype)
+            recv = [out, self._counts(bounds, row_size)]
+        with phase("comm"):
+            self.comm.Gatherv(band, recv, root=0)
+        return out
+
+    # ---------- Work-queue schedule ----------
+    def _dispatch(self, array, bounds, out):
+        # Rank 0: send chunk k as a (k, row0, row1) header plus its rows,
+        # collect results from whichever worker finishes, refill it
+        header = np.zeros(3, dtype=np.int64)
+        chunks = iter(range(len(bounds) - 1))
+
+        def send_next(dest):
+            k = next(chunks, None)
+            if k is None:
+                self.comm.Send(header, dest=dest, tag=TAG_STOP)
+                return False
+            header[:] = k, bounds[k], bounds[k + 1]
+            self.comm.Send(header, dest=dest, tag=TAG_WORK)
+            self.comm.Send(array[bounds[k]:bounds[k + 1]], dest=dest, tag=TAG_DATA)
+            return True
+
+        active = sum(send_next(dest) for dest in range(1, self.size))
+        status = MPI.Status()
+        while active:
+            self.comm.Recv(header, source=MPI.ANY_SOURCE, tag=TAG_DONE, status=status)
+            source = status.Get_source()
+            _, row0, row1 = header
+            self.comm.Recv(out[row0:row1], source=source, tag=TAG_DATA)
+            active -= not send_next(source)
+        return out
+
+    def _work(self, shape, dtype, fn, out_dtype):
+        # Ranks > 0: transform chunks until rank 0 sends TAG_STOP
+        header = np.zeros(3, dtype=np.int64)
+        status = MPI.Status()
+        while True:
+            with phase("comm"):
+                self.comm.Recv(header, source=0, tag=MPI.ANY_TAG, status=status)
+            if status.Get_tag() == TAG_STOP:
+                return None
+            _, row0, row1 = header
+            band = np.empty((row1 - row0,) + tuple(shape[1:]), dtype)
+            with phase("comm"):
+                self.comm.Recv(band, source=0, tag=TAG_DATA)
+            result = np.ascontiguousarray(fn(band), dtype=out_dtype)
+            with phase("comm"):
+                self.comm.Send(header, dest=0, tag=TAG_DONE)
+                self.comm.Send(result, dest=0, tag=TAG_DATA)
+
+    def map_rows(self, array, shape, dtype, unit, fn, out_dtype, out_channels=()):
+        """Apply fn to row bands of the array on rank 0; result on rank 0.
+
+        Bands are whole stripes of unit[0] rows; fn maps a band to a band of
+        the same height and width with out_channels trailing shape.
+        """
+        out_tail = (shape[1],) + tuple(out_channels)
+        if self.schedule == "dynamic" and self.size > 1:
+            stripes = -(-shape[0] // unit[0])
+            chunk = self.chunk_stripes or max(1, stripes // (4 * (self.size - 1)))
+            bounds = chunk_bounds(shape[0], unit[0], chunk)
+            if self.rank != 0:
+                return self._work(shape, dtype, fn, out_dtype)
+            out = np.empty((shape[0],) + out_tail, out_dtype)
+            with phase("comm"):  # the dispatcher only communicates
+                return self._dispatch(np.ascontiguousarray(array), bounds, out)
+        if self.overlap_steps > 1:
+            return self._map_rows_overlapped(array, shape, dtype, unit[0], fn, out_dtype, out_tail)
+
+        bounds = self.row_bounds(shape[0], unit[0])
+        band = self.scatter_rows(array, bounds, shape, dtype)
+        if len(band):
+            result = np.ascontiguousarray(fn(band), dtype=out_dtype)
+        else:
+            result = np.empty((0,) + out_tail, out_dtype)
+        return self.gather_rows(result, bounds)
+
+    def _map_rows_overlapped(self, array, shape, dtype, unit, fn, out_dtype, out_tail):
+        # Every rank makes the same overlap_steps Iscatterv/Igatherv calls in
+        # the same order (possibly with empty sub-bands); sub-bands land
+        # straight in place in the band, result and output buffers
+        bounds = self.row_bounds(shape[0], unit)
+        steps = self.overlap_steps
+        sub = [stripe_bounds(b - a, unit, steps) + a for a, b in zip(bounds[:-1], bounds[1:])]
+        row_in, row_out = int(np.prod(shape[1:])), int(np.prod(out_tail))
+        first = bounds[self.rank]
+        band = np.empty((bounds[self.rank + 1] - first,) + tuple(shape[1:]), dtype)
+        result = np.empty((len(band),) + tuple(out_tail), out_dtype)
+        out = None
+        if self.rank == 0:
+            array = np.ascontiguousarray(array)
+            out = np.empty((shape[0],) + tuple(out_tail), out_dtype)
+
+        def spec(buf, k, row_size):
+            # Rank r's rows of sub-band k within the full frame on rank 0
+            if self.rank != 0:
+                return None
+            lo = np.array([s[k] for s in sub])
+            hi = np.array([s[k + 1] for s in sub])
+            return [buf, (((hi - lo) * row_size).tolist(), (lo * row_size).tolist())]
+
+        def rows(k):
+            return slice(sub[self.rank][k] - first, sub[self.rank][k + 1] - first)
+
+        def scatter(k):
+            return self.comm.Iscatterv(spec(array, k, row_in), band[rows(k)], root=0)
+
+        gathers = []
+        with phase("comm"):
+            pending = scatter(0)
+        for k in range(steps):
+            with phase("comm"):
+                pending.Wait()
+                if k + 1 < steps:
+                    pending = scatter(k + 1)
+            if band[rows(k)].size:
+                result[rows(k)] = fn(band[rows(k)])
+            with phase("comm"):
+                gathers.append(self.comm.Igatherv(result[rows(k)], spec(out, k, row_out),
+                                                  root=0))
+        with phase("comm"):
+            MPI.Request.Waitall(gathers)
+        return out
+
+    # ---------- 2-D Cartesian tile decomposition ----------
+    def tile_bounds(self, shape, unit):
+        # (row0, row1, col0, col1) of every rank's tile, by grid coordinates
+        rows = stripe_bounds(shape[0], unit[0], self.dims[0])
+        cols = stripe_bounds(shape[1], unit[1], self.dims[1])
+        coords = (self.cart.Get_coords(r) for r in range(self.size))
+        return [(rows[i], rows[i + 1], cols[j], cols[j + 1]) for i, j in coords]
+
+    def scatter_tiles(self, array, tiles, shape, dtype):
+        # Rank 0 packs the tiles back to back for a single Scatterv
+        sizes = [(r1 - r0) * (c1 - c0) for r0, r1, c0, c1 in tiles]
+        send = None
+        with phase("comm"):
+            if self.rank == 0:
+                packed = np.concatenate([array[a:b, c:d].ravel() for a, b, c, d in tiles])
+                send = [packed, self._counts(np.cumsum([0] + sizes), int(np.prod(shape[2:])))]
+            r0, r1, c0, c1 = tiles[self.rank]
+            tile = np.empty((r1 - r0, c1 - c0) + tuple(shape[2:]), dtype)
+            self.comm.Scatterv(send, tile, root=0)
+        return tile
+
+    def map_tiles(self, array, shape, dtype, unit, fn, out_dtype, out_channels=()):
+        # As map_rows, on tiles of whole unit[0] x unit[1] blocks; rank 0
+        # unpacks the tiles from one Gatherv
+        tiles = self.tile_bounds(shape, unit)
+        sizes = [(r1 - r0) * (c1 - c0) for r0, r1, c0, c1 in tiles]
+        r0, r1, c0, c1 = tiles[self.rank]
+        tile = self.scatter_tiles(array, tiles, shape, dtype)
+
+        if tile.size:
+            result = np.ascontiguousarray(fn(tile), dtype=out_dtype)
+        else:
+            result = np.empty((r1 - r0, c1 - c0) + tuple(out_channels), out_dtype)
+
+        channels = int(np.prod(out_channels))
+        packed = recv = None
+        if self.rank == 0:
+            packed = np.empty(sum(sizes) * channels, out_dtype)
+            recv = [packed, self._counts(np.cumsum([0] + sizes), channels)]
+        with phase("comm"):
+            self.comm.Gatherv(result, recv, root=0)
+        if self.rank != 0:
+            return None
+        out = np.empty(tuple(shape[:2]) + tuple(out_channels), out_dtype)
+        offset = 0
+        with phase("comm"):
+            for (a, b, c, d), n in zip(tiles, sizes):
+                out[a:b, c:d] = packed[offset * channels:(offset + n) * channels].reshape(
+                    (b - a, d - c) + tuple(out_channels))
+                offset += n
+        return out
+
+    # ---------- Node-local shared memory ----------
+    def shared_array(self, shape, dtype):
+        # Array in a window allocated by the node leader and mapped by every
+        # rank of the node; free the returned window when done
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape)) * dtype.itemsize if self.node.Get_rank() == 0 else 0
+        win = MPI.Win.Allocate_shared(size, dtype.itemsize, comm=self.node)
+        buf, _ = win.Shared_query(0)
+        return win, np.ndarray(shape, dtype, buffer=buf)
+
+    def map_shared(self, array, shape, dtype, unit, fn, out_dtype, out_channels=()):
+        """As map_rows/map_tiles, on views of one frame per node.
+
+        Rank 0 copies the array into its node's window and the leaders Bcast
+        it to the other nodes' windows. Every rank transforms its own band
+        (or tile) straight from the window into the shared output frame;
+        with several nodes, the leaders Reduce the frames (zero outside each
+        node's parts) onto rank 0.
+        """
+        if self.decomposition == "tiles":
+            parts = self.tile_bounds(shape, unit)
+        else:
+            bounds = self.row_bounds(shape[0], unit[0])
+            parts = [(a, b, 0, shape[1]) for a, b in zip(bounds[:-1], bounds[1:])]
+        in_win, frame = self.shared_array(shape, dtype)
+        out_win, out = self.shared_array(tuple(shape[:2]) + tuple(out_channels), out_dtype)
+        nodes = self.leaders.Get_size() if self.leaders != MPI.COMM_NULL else 0
+        with phase("comm"):
+            if self.rank == 0:
+                frame[...] = array
+            if nodes > 1:
+                self.leaders.Bcast(frame, root=0)
+                out[...] = 0
+            in_win.Fence()
+            out_win.Fence()
+
+        r0, r1, c0, c1 = parts[self.rank]
+        if r1 > r0 and c1 > c0:
+            out[r0:r1, c0:c1] = fn(frame[r0:r1, c0:c1])
+
+        with phase("comm"):
+            out_win.Fence()
+            if nodes > 1:
+                send = MPI.IN_PLACE if self.rank == 0 else out
+                self.leaders.Reduce(send, out if self.rank == 0 else None, op=MPI.SUM, root=0)
+        result = out.copy() if self.rank == 0 else None
+        in_win.Free()
+        out_win.Free()
+        return result
+
+    def map_blocks(self, array, unit, fn, out_dtype=None, out_channels=()):
+        # Row bands or tiles of the array on rank 0, per self.decomposition
+        shape, dtype = self._header(array)
+        mapper = self.map_tiles if self.decomposition == "tiles" else self.map_rows
+        if self.shared:
+            mapper = self.map_shared
+        return mapper(array, shape, dtype, unit, fn, out_dtype or dtype, out_channels)
+
+    # ---------- Collective operations ----------
+    def process_channel(self, channel, Q, block_size=8):
+        # channel: padded 2-D array on rank 0
+        return self.map_blocks(channel, (block_size, block_size),
+                               lambda band: self.local.process_channel(band, Q, block_size))
+
+    def compress(self, image, block_size=8, quality=50, subsampling="4:4:4", fixed_point=False):
+        # Bands/tiles are whole chroma blocks (block_size * fy x block_size * fx
+        # pixels), so each compresses exactly as its part of the full image
+        fx, fy = subsampling_factors(subsampling)
+        return self.map_blocks(image, (block_size * fy, block_size * fx),
+                               lambda part: pipeline.compress(part, self.local, block_size,
+                                                              quality, subsampling, fixed_point),
+                               np.uint8, (3,))
+
+    def _encode_local(self, image, quality, optimize, restart_rows, subsampling, fixed_point):
+        # Collective part of the encode: returns (JFIF header, this rank's
+        # entropy-coded bytes with their RST markers), the same header on
+        # every rank
+        Q_luma, Q_chroma = quant_tables(quality, 8)
+        sampling = subsampling_factors(subsampling)
+        mcu_h, mcu_w = 8 * sampling[1], 8 * sampling[0]
+        shape, dtype = self._header(image)
+        h, w = shape[:2]
+        mcu_rows = -(-h // mcu_h)
+        mcus_per_row = -(-w // mcu_w)
+        if restart_rows:
+            check_restart_rows(restart_rows, mcus_per_row)
+        else:
+            # One interval per rank, unless that exceeds what DRI can
+            # express; then each rank codes several
+            restart_rows = min(-(-mcu_rows // self.size), max_restart_rows(mcus_per_row))
+
+        # Whole intervals per rank
+        bounds = self.row_bounds(h, restart_rows * mcu_h)
+        stripe = self.scatter_rows(image, bounds, shape, dtype)
+        if len(stripe):
+            quantized = pipeline.quantize_components(self.local, stripe, Q_luma, Q_chroma,
+                                                     subsampling, fixed_point)
+            with phase("entropy"):
+                components = [to_zigzag(q) for q in quantized]
+                segments = scan_segments(components, restart_rows, sampling=sampling)
+        else:
+            segments = []
+
+        if optimize:
+            histogram = np.zeros((4, 256), dtype=np.int64)
+            if segments:
+                with phase("entropy"):
+                    histogram += segments_histogram(segments)
+            with phase("comm"):
+                self.comm.Allreduce(MPI.IN_PLACE, histogram, op=MPI.SUM)
+            huffman_tables = optimal_tables(histogram)
+        else:
+            huffman_tables = STANDARD_TABLES
+        with phase("entropy"):
+            packed = pack_segments(segments, huffman_tables)
+
+        first = bounds[self.rank] // (restart_rows * mcu_h)
+        header = jfif_header(h, w, Q_luma, Q_chroma, huffman_tables,
+                             restart_rows * mcus_per_row, sampling)
+        return header, join_segments(packed, first)
+
+    def encode_jpeg(self, image, quality=50, optimize=False, restart_rows=0,
+                    subsampling="4:4:4", fixed_point=False):
+        """Collective JFIF encode of the image held on rank 0.
+
+        The scan is cut into restart intervals of restart_rows MCU rows
+        (default: one interval per rank, split further where an interval
+        would exceed the 65535 MCUs of DRI). Each rank receives the rows of
+        its own intervals, converts, transforms and Huffman codes them; the
+        coded bytes are gathered on rank 0, which returns the file bytes.
+        Other ranks return None. Always uses the static schedule: optimized
+        tables need every interval's histogram before any is packed.
+        """
+        header, coded = self._encode_local(image, quality, optimize, restart_rows,
+                                           subsampling, fixed_point)
+        local = np.frombuffer(coded, dtype=np.uint8)
+        with phase("comm"):
+            sizes = self.comm.gather(local.size, root=0)
+            data = np.empty(sum(sizes), dtype=np.uint8) if self.rank == 0 else None
+            self.comm.Gatherv(local, (data, sizes) if self.rank == 0 else None, root=0)
+        if self.rank != 0:
+            return None
+        return header + data.tobytes() + EOI
+
+    # ---------- Parallel output (MPI-IO) ----------
+    def _open(self, path):
+        # Collective create/truncate of path for writing
+        path = Path(path)
+        if self.rank == 0:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.comm.Barrier()
+        fh = MPI.File.Open(self.comm, str(path), MPI.MODE_WRONLY | MPI.MODE_CREATE)
+        fh.Set_size(0)
+        return fh
+
+    def encode_to_file(self, path, image, quality=50, optimize=False, restart_rows=0,
+                       subsampling="4:4:4", fixed_point=False):
+        """As encode_jpeg, but every rank writes its own restart intervals.
+
+        The byte offset of each rank's segments follows from an Exscan of
+        the coded sizes; rank 0 adds the header and EOI. Nothing is
+        funnelled through rank 0. Returns the file size on every rank.
+        """
+        header, coded = self._encode_local(image, quality, optimize, restart_rows,
+                                           subsampling, fixed_point)
+        with phase("comm"):
+            offset = self.comm.exscan(len(coded)) or 0
+            total = self.comm.allreduce(len(coded))
+        with phase("save"):
+            fh = self._open(path)
+            fh.Write_at_all(len(header) + offset, np.frombuffer(coded, dtype=np.uint8))
+            if self.rank == 0:
+                fh.Write_at(0, np.frombuffer(header, dtype=np.uint8))
+                fh.Write_at(len(header) + total, np.frombuffer(EOI, dtype=np.uint8))
+            fh.Close()
+        return len(header) + total + len(EOI)
+
+    def compress_to_file(self, path, image, block_size=8, quality=50, subsampling="4:4:4",
+                         fixed_point=False):
+        """As compress, but the result is written as a binary PPM (P6) file
+        by all ranks at once: each rank writes its band (Write_at_all at
+        its row offset) or its tile (a subarray file view) directly.
+        Static schedule only. Returns the file size on every rank.
+        """
+        if self.schedule == "dynamic":
+            raise ValueError("compress_to_file uses the static schedule")
+        fx, fy = subsampling_factors(subsampling)
+        unit = (block_size * fy, block_size * fx)
+        shape, dtype = self._header(image)
+        h, w = shape[:2]
+        header = np.frombuffer(f"P6\n{w} {h}\n255\n".encode(), dtype=np.uint8)
+
+        if self.decomposition == "tiles":
+            tiles = self.tile_bounds(shape, unit)
+            r0, r1, c0, c1 = tiles[self.rank]
+            part = self.scatter_tiles(image, tiles, shape, dtype)
+        else:
+            bounds = self.row_bounds(h, unit[0])
+            r0, r1, c0, c1 = bounds[self.rank], bounds[self.rank + 1], 0, w
+            part = self.scatter_rows(image, bounds, shape, dtype)
+
+        rgb = np.empty((r1 - r0, c1 - c0, 3), dtype=np.uint8)
+        if rgb.size:
+            rgb[...] = pipeline.compress(part, self.local, block_size, quality, subsampling,
+                                         fixed_point)
+
+        with phase("save"):
+            fh = self._open(path)
+            if self.rank == 0:
+                fh.Write_at(0, header)
+            if self.decomposition == "tiles":
+                if rgb.size:
+                    filetype = MPI.BYTE.Create_subarray([h, w * 3], [r1 - r0, (c1 - c0) * 3],
+                                                        [r0, c0 * 3]).Commit()
+                else:
+                    filetype = MPI.BYTE
+                fh.Set_view(header.size, MPI.BYTE, filetype)
+                fh.Write_all(rgb)
+                if filetype != MPI.BYTE:
+                    filetype.Free()
+            else:
+                fh.Write_at_all(header.size + r0 * w * 3, rgb)
+            fh.Close()
+        return header.size + h * w * 3
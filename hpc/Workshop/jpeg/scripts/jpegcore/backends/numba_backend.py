@@ -0,0 +1,374 @@
+import numba
+import numpy as np
+from numba import njit, prange
+
+from ..aan import C2_2, C2_S2, C4, C6, C6_S2, I1, I2, SQRT2, aan_quant_tables
+from ..blocks import blockify
+from ..color import (CBCR_TO_RGB_FIXED, ONE_HALF, RGB_TO_YCBCR, RGB_TO_YCBCR_FIXED, SCALEBITS,
+                     YCBCR_OFFSET, YCBCR_OFFSET_FIXED, YCBCR_TO_RGB)
+from ..dct import dct_matrix
+from .base import Backend
+
+
+# ---------- Separable 8x8 (or NxN) transforms on a precomputed basis ----------
+# C[k, n] = alpha_k * cos(pi * (2n + 1) * k / 2N) is built once by dct_matrix,
+# so the kernels are plain multiply-adds: a row pass then a column pass,
+# O(N^3) per block instead of the O(N^4) double sum with cos() inside.
+@njit(cache=True)
+def dct_block(block, C, tmp, out):
+    N = C.shape[0]
+    for u in range(N):
+        for y in range(N):
+            s = 0.0
+            for x in range(N):
+                s += C[u, x] * block[x, y]
+            tmp[u, y] = s
+    for u in range(N):
+        for v in range(N):
+            s = 0.0
+            for y in range(N):
+                s += tmp[u, y] * C[v, y]
+            out[u, v] = s
+
+
+@njit(cache=True)
+def idct_block(coeffs, C, tmp, out):
+    N = C.shape[0]
+    for x in range(N):
+        for v in range(N):
+            s = 0.0
+            for u in range(N):
+                s += C[u, x] * coeffs[u, v]
+            tmp[x, v] = s
+    for x in range(N):
+        for y in range(N):
+            s = 0.0
+            for v in range(N):
+                s += tmp[x, v] * C[v, y]
+            out[x, y] = s
+
+
+# ---------- Whole-channel kernels (no per-block Python dispatch) ----------
+@njit(cache=True)
+def dct_quant_channel(channel, Q, C):
+    N = C.shape[0]
+    h, w = channel.shape
+    quantized = np.empty((h, w), dtype=np.int32)
+    block = np.empty((N, N))
+    tmp = np.empty((N, N))
+    coeffs = np.empty((N, N))
+    for i in range(0, h, N):
+        for j in range(0, w, N):
+            for x in range(N):
+                for y in range(N):
+                    block[x, y] = channel[i + x, j + y] - 128.0
+            dct_block(block, C, tmp, coeffs)
+            for u in range(N):
+                for v in range(N):
+                    quantized[i + u, j + v] = np.int32(np.round(coeffs[u, v] / Q[u, v]))
+    return quantized
+
+
+@njit(cache=True)
+def idct_dequant_channel(quantized, Q, C, out):
+    N = C.shape[0]
+    h, w = quantized.shape
+    coeffs = np.empty((N, N))
+    tmp = np.empty((N, N))
+    block = np.empty((N, N))
+    for i in range(0, h, N):
+        for j in range(0, w, N):
+            for u in range(N):
+                for v in range(N):
+                    coeffs[u, v] = quantized[i + u, j + v] * Q[u, v]
+            idct_block(coeffs, C, tmp, block)
+            for x in range(N):
+                for y in range(N):
+                    out[i + x, j + y] = block[x, y] + 128.0
+    return out
+
+
+# ---------- Fused, multi-threaded channel kernel ----------
+@njit(parallel=True, cache=True)
+def process_channel_parallel(channel, Q, C, out):
+    # Block rows are independent: prange hands them to the Numba thread
+    # pool and each row does DCT, quantize, dequantize and IDCT in one pass
+    N = C.shape[0]
+    h, w = channel.shape
+    for bi in prange(h // N):
+        i = bi * N
+        block = np.empty((N, N))
+        tmp = np.empty((N, N))
+        coeffs = np.empty((N, N))
+        for j in range(0, w, N):
+            for x in range(N):
+                for y in range(N):
+                    block[x, y] = channel[i + x, j + y] - 128.0
+            dct_block(block, C, tmp, coeffs)
+            for u in range(N):
+                for v in range(N):
+                    coeffs[u, v] = np.round(coeffs[u, v] / Q[u, v]) * Q[u, v]
+            idct_block(coeffs, C, tmp, block)
+            for x in range(N):
+                for y in range(N):
+                    out[i + x, j + y] = block[x, y] + 128.0
+    return out
+
+
+# ---------- AAN engine: in-place 8-point butterflies (see aan.py) ----------
+@njit(cache=True)
+def aan_fdct_8(d):
+    tmp0 = d[0] + d[7]
+    tmp7 = d[0] - d[7]
+    tmp1 = d[1] + d[6]
+    tmp6 = d[1] - d[6]
+    tmp2 = d[2] + d[5]
+    tmp5 = d[2] - d[5]
+    tmp3 = d[3] + d[4]
+    tmp4 = d[3] - d[4]
+
+    tmp10 = tmp0 + tmp3
+    tmp13 = tmp0 - tmp3
+    tmp11 = tmp1 + tmp2
+    tmp12 = tmp1 - tmp2
+    d[0] = tmp10 + tmp11
+    d[4] = tmp10 - tmp11
+    z1 = (tmp12 + tmp13) * C4
+    d[2] = tmp13 + z1
+    d[6] = tmp13 - z1
+
+    tmp10 = tmp4 + tmp5
+    tmp11 = tmp5 + tmp6
+    tmp12 = tmp6 + tmp7
+    z5 = (tmp10 - tmp12) * C6
+    z2 = C6_S2 * tmp10 + z5
+    z4 = C2_S2 * tmp12 + z5
+    z3 = tmp11 * C4
+    z11 = tmp7 + z3
+    z13 = tmp7 - z3
+    d[5] = z13 + z2
+    d[3] = z13 - z2
+    d[1] = z11 + z4
+    d[7] = z11 - z4
+
+
+@njit(cache=True)
+def aan_idct_8(c):
+    tmp10 = c[0] + c[4]
+    tmp11 = c[0] - c[4]
+    tmp13 = c[2] + c[6]
+    tmp12 = (c[2] - c[6]) * SQRT2 - tmp13
+    tmp0 = tmp10 + tmp13
+    tmp3 = tmp10 - tmp13
+    tmp1 = tmp11 + tmp12
+    tmp2 = tmp11 - tmp12
+
+    z13 = c[5] + c[3]
+    z10 = c[5] - c[3]
+    z11 = c[1] + c[7]
+    z12 = c[1] - c[7]
+    tmp7 = z11 + z13
+    tmp11 = (z11 - z13) * SQRT2
+    z5 = (z10 + z12) * C2_2
+    tmp10 = I1 * z12 - z5
+    tmp12 = -I2 * z10 + z5
+    tmp6 = tmp12 - tmp7
+    tmp5 = tmp11 - tmp6
+    tmp4 = tmp10 + tmp5
+
+    c[0] = tmp0 + tmp7
+    c[7] = tmp0 - tmp7
+    c[1] = tmp1 + tmp6
+    c[6] = tmp1 - tmp6
+    c[2] = tmp2 + tmp5
+    c[5] = tmp2 - tmp5
+    c[4] = tmp3 + tmp4
+    c[3] = tmp3 - tmp4
+
+
+@njit(parallel=True, cache=True)
+def process_channel_parallel_aan(channel, fwd_divisors, inv_multipliers, out):
+    h, w = channel.shape
+    for bi in prange(h // 8):
+        i = bi * 8
+        block = np.empty((8, 8))
+        for j in range(0, w, 8):
+            for x in range(8):
+                for y in range(8):
+                    block[x, y] = channel[i + x, j + y] - 128.0
+            for x in range(8):
+                aan_fdct_8(block[x, :])
+            for y in range(8):
+                aan_fdct_8(block[:, y])
+            for u in range(8):
+                for v in range(8):
+                    block[u, v] = np.round(block[u, v] / fwd_divisors[u, v]) * inv_multipliers[u, v]
+            for v in range(8):
+                aan_idct_8(block[:, v])
+            for x in range(8):
+                aan_idct_8(block[x, :])
+            for x in range(8):
+                for y in range(8):
+                    out[i + x, j + y] = block[x, y] + 128.0
+    return out
+
+
+# ---------- Chroma subsampling ----------
+# Box-filter mean over fy x fx patches (clamped at the edges, as the NumPy
+# version replicates the last row/column) and pixel-replication upsampling.
+@njit(parallel=True, cache=True)
+def downsample_channel(channel, fx, fy, out):
+    h, w = channel.shape
+    hs, ws = out.shape
+    scale = 1.0 / (fx * fy)
+    for i in prange(hs):
+        for j in range(ws):
+            s = 0.0
+            for di in range(fy):
+                for dj in range(fx):
+                    s += channel[min(i * fy + di, h - 1), min(j * fx + dj, w - 1)]
+            out[i, j] = s * scale
+    return out
+
+
+@njit(parallel=True, cache=True)
+def upsample_channel(channel, fx, fy, out):
+    h, w = out.shape
+    for i in prange(h):
+        for j in range(w):
+            out[i, j] = channel[i // fy, j // fx]
+    return out
+
+
+# ---------- Fused colour conversion ----------
+# One pass over the pixels, writing into preallocated planes: no full-frame
+# temporaries. The fixed-point pair is the IJG integer arithmetic.
+@njit(parallel=True, cache=True)
+def rgb_to_ycbcr_kernel(image, M, offset, out):
+    h, w = image.shape[:2]
+    for i in prange(h):
+        for j in range(w):
+            r, g, b = image[i, j, 0], image[i, j, 1], image[i, j, 2]
+            for k in range(3):
+                out[k, i, j] = M[k, 0] * r + M[k, 1] * g + M[k, 2] * b + offset[k]
+    return out
+
+
+@njit(parallel=True, cache=True)
+def rgb_to_ycbcr_fixed_kernel(image, M, offset, out):
+    h, w = image.shape[:2]
+    for i in prange(h):
+        for j in range(w):
+            r, g, b = np.int32(image[i, j, 0]), np.int32(image[i, j, 1]), np.int32(image[i, j, 2])
+            for k in range(3):
+                out[k, i, j] = (M[k, 0] * r + M[k, 1] * g + M[k, 2] * b + offset[k]) >> SCALEBITS
+    return out
+
+
+@njit(parallel=True, cache=True)
+def ycbcr_to_rgb_kernel(Y, Cb, Cr, M, out):
+    h, w = Y.shape
+    for i in prange(h):
+        for j in range(w):
+            y, cb, cr = Y[i, j], Cb[i, j] - 128.0, Cr[i, j] - 128.0
+            for k in range(3):
+                v = M[k, 0] * y + M[k, 1] * cb + M[k, 2] * cr
+                out[i, j, k] = min(max(v, 0.0), 255.0)
+    return out
+
+
+@njit(parallel=True, cache=True)
+def ycbcr_to_rgb_fixed_kernel(Y, Cb, Cr, M, out):
+    # Y, Cb, Cr may be reconstructed floats: rounded and range limited first
+    h, w = Y.shape
+    for i in prange(h):
+        for j in range(w):
+            y = min(max(np.int32(np.rint(Y[i, j])), 0), 255)
+            cb = min(max(np.int32(np.rint(Cb[i, j])), 0), 255) - 128
+            cr = min(max(np.int32(np.rint(Cr[i, j])), 0), 255) - 128
+            for k in range(3):
+                v = y + ((M[k, 0] * cb + M[k, 1] * cr + ONE_HALF) >> SCALEBITS)
+                out[i, j, k] = min(max(v, 0), 255)
+    return out
+
+
+class NumbaBackend(Backend):
+    """threads=None uses every core Numba sees (NUMBA_NUM_THREADS);
+    parallel=False runs the single-threaded two-pass kernels.
+    engine="aan" swaps the basis-matrix DCT for the AAN butterflies
+    (8x8 blocks only, fused parallel kernel only)."""
+
+    name = "numba"
+
+    def __init__(self, threads=None, parallel=True, engine="matrix"):
+        if engine not in ("matrix", "aan"):
+            raise ValueError(f"Unknown DCT engine {engine!r}, choose 'matrix' or 'aan'")
+        if engine == "aan" and not parallel:
+            raise ValueError("engine='aan' runs in the fused parallel kernel; use threads=1 for a serial run")
+        self.threads = threads
+        self.parallel = parallel
+        self.engine = engine
+        self._C = {}
+
+    def dct_matrix(self, block_size):
+        if block_size not in self._C:
+            self._C[block_size] = dct_matrix(block_size)
+        return self._C[block_size]
+
+    def _set_threads(self):
+        # Per call: several instances with different thread counts may coexist
+        if self.threads is not None:
+            numba.set_num_threads(self.threads)
+
+    def rgb_to_ycbcr(self, image, fixed_point=False):
+        self._set_threads()
+        h, w = image.shape[:2]
+        if fixed_point:
+            out = np.empty((3, h, w), dtype=np.uint8)
+            rgb_to_ycbcr_fixed_kernel(np.asarray(image, dtype=np.uint8), RGB_TO_YCBCR_FIXED,
+                                      YCBCR_OFFSET_FIXED, out)
+        else:
+            out = np.empty((3, h, w), dtype=np.float32)
+            rgb_to_ycbcr_kernel(image, RGB_TO_YCBCR, YCBCR_OFFSET, out)
+        return out[0], out[1], out[2]
+
+    def ycbcr_to_rgb(self, Y, Cb, Cr, fixed_point=False):
+        self._set_threads()
+        rgb = np.empty(Y.shape + (3,), dtype=np.uint8)
+        if fixed_point:
+            return ycbcr_to_rgb_fixed_kernel(Y, Cb, Cr, CBCR_TO_RGB_FIXED, rgb)
+        return ycbcr_to_rgb_kernel(Y, Cb, Cr, YCBCR_TO_RGB, rgb)
+
+    def downsample(self, channel, fx, fy):
+        if fx == 1 and fy == 1:
+            return channel
+        self._set_threads()
+        h, w = channel.shape
+        out = np.empty((-(-h // fy), -(-w // fx)), dtype=np.float32)
+        return downsample_channel(channel, fx, fy, out)
+
+    def upsample(self, channel, fx, fy, h, w):
+        if fx == 1 and fy == 1:
+            return channel[:h, :w]
+        self._set_threads()
+        return upsample_channel(channel, fx, fy, np.empty((h, w), dtype=channel.dtype))
+
+    def quantize_channel(self, channel, Q, block_size=8):
+        # Both engines produce the same coefficients; use the separable kernel
+        Q = np.ascontiguousarray(Q, dtype=np.float64)
+        return blockify(dct_quant_channel(channel, Q, self.dct_matrix(block_size)), block_size)
+
+    def process_channel(self, channel, Q, block_size=8):
+        C = self.dct_matrix(block_size)
+        Q = np.ascontiguousarray(Q, dtype=np.float64)
+        if self.parallel:
+            self._set_threads()
+            if self.engine == "aan":
+                if block_size != 8:
+                    raise ValueError("engine='aan' requires block_size=8")
+                fwd_divisors, inv_multipliers = aan_quant_tables(Q)
+                return process_channel_parallel_aan(channel, fwd_divisors, inv_multipliers,
+                                                    np.empty_like(channel))
+            return process_channel_parallel(channel, Q, C, np.empty_like(channel))
+        quantized = dct_quant_channel(channel, Q, C)
+        return idct_dequant_channel(quantized, Q, C, np.empty_like(channel))
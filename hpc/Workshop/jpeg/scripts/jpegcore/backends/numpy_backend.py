@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ..aan import aan_dct_quant_blocks, aan_idct_dequant_blocks, aan_quant_tables
+from ..blocks import blockify
+from ..dct import dct_matrix, dct_quant_blocks, idct_dequant_blocks
+from .base import Backend
+
+
+class NumpyBackend(Backend):
+    """engine="matrix" computes C @ X @ C.T per block; engine="aan" uses
+    the AAN butterflies with the scaling folded into Q (8x8 only).
+    threads > 1 transforms the stripes on a thread pool (NumPy releases
+    the GIL inside matmul and the ufuncs); the default is one thread."""
+
+    name = "numpy"
+
+    def __init__(self, engine="matrix", threads=None):
+        if engine not in ("matrix", "aan"):
+            raise ValueError(f"Unknown DCT engine {engine!r}, choose 'matrix' or 'aan'")
+        self.engine = engine
+        self.threads = threads
+        self._C = {}
+        self._pool = ThreadPoolExecutor(threads) if threads and threads > 1 else None
+
+    def _map(self, fn, items):
+        # Run fn over items on the pool (or inline) and wait for all of them
+        if self._pool is None:
+            return list(map(fn, items))
+        return list(self._pool.map(fn, items))
+
+    def dct_matrix(self, block_size):
+        if block_size not in self._C:
+            self._C[block_size] = dct_matrix(block_size)
+        return self._C[block_size]
+
+    def quantize_channel(self, channel, Q, block_size=8):
+        blocks = blockify(channel, block_size)
+        if self.engine == "aan":
+            return aan_dct_quant_blocks(blocks, aan_quant_tables(Q)[0])
+        return dct_quant_blocks(blocks, Q, self.dct_matrix(block_size))
+
+    def process_channel(self, channel, Q, block_size=8, stripe_rows=8):
+        # Every block of a stripe is transformed in one broadcast matmul;
+        # stripes keep the float64 temporaries small on 24 MP frames
+        compressed = np.empty_like(channel)
+        blocks = blockify(channel, block_size)
+        out = blockify(compressed, block_size)
+        if self.engine == "aan":
+            if block_size != 8:
+                raise ValueError("engine='aan' requires block_size=8")
+            fwd_divisors, inv_multipliers = aan_quant_tables(Q)
+
+            def stripe(r):
+                quantized = aan_dct_quant_blocks(blocks[r:r+stripe_rows], fwd_divisors)
+                out[r:r+stripe_rows] = aan_idct_dequant_blocks(quantized, inv_multipliers)
+        else:
+            C = self.dct_matrix(block_size)
+
+            def stripe(r):
+                quantized = dct_quant_blocks(blocks[r:r+stripe_rows], Q, C)
+                out[r:r+stripe_rows] = idct_dequant_blocks(quantized, Q, C)
+
+        self._map(stripe, range(0, blocks.shape[0], stripe_rows))
+        return compressed
@@ -0,0 +1,520 @@
+import hashlib
+import os
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pyopencl as cl
+
+from .. import pipeline
+from ..chroma import subsampling_factors
+from ..dct import dct_matrix
+from ..quant import quant_tables
+from .base import Backend
+
+# "GPU", "CPU", "ACCELERATOR", "ALL" or part of a device/platform name
+DEVICE_ENV = "JPEGCORE_OPENCL_DEVICE"
+CACHE_ENV = "JPEGCORE_OPENCL_CACHE"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "jpegcore" / "opencl"
+
+# ---------- Kernels ----------
+KERNEL_SOURCE = """
+// One N x N block per work-group of N x L work-items (L <= N; work-item
+// (x, l) handles columns l, l + L, ...), on the padded row-major channel.
+// C is the orthonormal DCT matrix and Q the quantization table, both in
+// __constant memory; the block is staged in __local memory (tile, tmp:
+// N*N floats each) and transformed separably, columns then rows, so each
+// output costs 2N multiply-adds and no cos()/sqrt().
+__kernel void dct_quant(__global const float* input, __global float* output,
+                        __constant float* C, __constant float* Q, int N,
+                        __local float* tile, __local float* tmp) {
+    int x = get_local_id(0);
+    int l = get_local_id(1), L = get_local_size(1);
+    int width = get_num_groups(1) * N;
+    __global const float* in = input + get_group_id(0) * N * width + get_group_id(1) * N;
+    __global float* out = output + get_group_id(0) * N * width + get_group_id(1) * N;
+
+    for (int y = l; y < N; y += L)
+        tile[x * N + y] = in[x * width + y] - 128.0f;
+    barrier(CLK_LOCAL_MEM_FENCE);
+    // tmp = C @ tile
+    for (int y = l; y < N; y += L) {
+        float s = 0.0f;
+        for (int k = 0; k < N; k++)
+            s += C[x * N + k] * tile[k * N + y];
+        tmp[x * N + y] = s;
+    }
+    barrier(CLK_LOCAL_MEM_FENCE);
+    // coefficients = tmp @ C.T, quantized in place of the block
+    for (int v = l; v < N; v += L) {
+        float s = 0.0f;
+        for (int k = 0; k < N; k++)
+            s += tmp[x * N + k] * C[v * N + k];
+        out[x * width + v] = round(s / Q[x * N + v]);
+    }
+}
+
+// Inverse of dct_quant on the same layout: C.T @ (coefficients * Q) @ C + 128
+__kernel void idct_dequant(__global const float* input, __global float* output,
+                           __constant float* C, __constant float* Q, int N,
+                           __local float* tile, __local float* tmp) {
+    int x = get_local_id(0);
+    int l = get_local_id(1), L = get_local_size(1);
+    int width = get_num_groups(1) * N;
+    __global const float* in = input + get_group_id(0) * N * width + get_group_id(1) * N;
+    __global float* out = output + get_group_id(0) * N * width + get_group_id(1) * N;
+
+    for (int v = l; v < N; v += L)
+        tile[x * N + v] = in[x * width + v] * Q[x * N + v];
+    barrier(CLK_LOCAL_MEM_FENCE);
+    // tmp = C.T @ tile
+    for (int v = l; v < N; v += L) {
+        float s = 0.0f;
+        for (int k = 0; k < N; k++)
+            s += C[k * N + x] * tile[k * N + v];
+        tmp[x * N + v] = s;
+    }
+    barrier(CLK_LOCAL_MEM_FENCE);
+    // pixels = tmp @ C
+    for (int y = l; y < N; y += L) {
+        float s = 0.0f;
+        for (int k = 0; k < N; k++)
+            s += tmp[x * N + k] * C[k * N + y];
+        out[x * width + y] = s + 128.0f;
+    }
+}
+
+__kernel void ycbcr_to_rgb(
+    __global float* Y,
+    __global float* Cb,
+    __global float* Cr,
+    __global uchar* RGB,
+    int size)
+{
+    int i = get_global_id(0);
+    float y  = Y[i];
+    float cb = Cb[i] - 128.0f;
+    float cr = Cr[i] - 128.0f;
+
+    float r = y + 1.402f * cr;
+    float g = y - 0.344136f * cb - 0.714136f * cr;
+    float b = y + 1.772f * cb;
+
+    RGB[i * 3 + 0] = clamp((int)r, 0, 255);
+    RGB[i * 3 + 1] = clamp((int)g, 0, 255);
+    RGB[i * 3 + 2] = clamp((int)b, 0, 255);
+}
+
+__kernel void downsample_channel(__global const float* input, __global float* output,
+                         int h, int w, int fx, int fy) {
+    int i = get_global_id(0);
+    int j = get_global_id(1);
+    int ws = get_global_size(1);
+
+    float s = 0.0f;
+    for (int di = 0; di < fy; di++) {
+        for (int dj = 0; dj < fx; dj++) {
+            int x = min(i * fy + di, h - 1);
+            int y = min(j * fx + dj, w - 1);
+            s += input[x * w + y];
+        }
+    }
+    output[i * ws + j] = s / (fx * fy);
+}
+
+__kernel void upsample_channel(__global const float* input, __global float* output,
+                       int ws, int fx, int fy) {
+    int i = get_global_id(0);
+    int j = get_global_id(1);
+    int w = get_global_size(1);
+    output[i * w + j] = input[(i / fy) * ws + j / fx];
+}
+
+// ---------- Fused round trip: the frame stays on the device ----------
+// RGB (h, w, 3) -> Y, Cb, Cr planes zero-padded to the global size (Hp, Wp)
+__kernel void rgb_to_ycbcr_planes(__global const float* rgb, __global float* Y,
+                                  __global float* Cb, __global float* Cr, int h, int w) {
+    int i = get_global_id(0);
+    int j = get_global_id(1);
+    int k = i * get_global_size(1) + j;
+    if (i >= h || j >= w) {
+        Y[k] = Cb[k] = Cr[k] = 0.0f;
+        return;
+    }
+    __global const float* p = rgb + (i * w + j) * 3;
+    Y[k]  =  0.299f * p[0] + 0.587f * p[1] + 0.114f * p[2];
+    Cb[k] = -0.168736f * p[0] - 0.331264f * p[1] + 0.5f * p[2] + 128.0f;
+    Cr[k] =  0.5f * p[0] - 0.418688f * p[1] - 0.081312f * p[2] + 128.0f;
+}
+
+// fy x fx box filter of the h x w corner of a plane `stride` wide (edges
+// replicated) into an hs x ws plane zero-padded to the global size
+__kernel void downsample_plane(__global const float* input, __global float* output,
+                               int h, int w, int stride, int fx, int fy, int hs, int ws) {
+    int i = get_global_id(0);
+    int j = get_global_id(1);
+    float s = 0.0f;
+    if (i < hs && j < ws) {
+        for (int di = 0; di < fy; di++)
+            for (int dj = 0; dj < fx; dj++)
+                s += input[min(i * fy + di, h - 1) * stride + min(j * fx + dj, w - 1)];
+        s /= fx * fy;
+    }
+    output[i * get_global_size(1) + j] = s;
+}
+
+// Y plane (Y_stride wide) and chroma planes (C_stride wide, upsampled by
+// pixel replication) -> uchar RGB (h, w, 3), h x w = the global size
+__kernel void ycbcr_planes_to_rgb(__global const float* Y, __global const float* Cb,
+                                  __global const float* Cr, __global uchar* RGB,
+                                  int Y_stride, int C_stride, int fx, int fy) {
+    int i = get_global_id(0);
+    int j = get_global_id(1);
+    int c = (i / fy) * C_stride + j / fx;
+    float y  = Y[i * Y_stride + j];
+    float cb = Cb[c] - 128.0f;
+    float cr = Cr[c] - 128.0f;
+
+    __global uchar* p = RGB + (i * get_global_size(1) + j) * 3;
+    p[0] = clamp((int)(y + 1.402f * cr), 0, 255);
+    p[1] = clamp((int)(y - 0.344136f * cb - 0.714136f * cr), 0, 255);
+    p[2] = clamp((int)(y + 1.772f * cb), 0, 255);
+}
+"""
+
+
+# ---------- Device selection ----------
+def _devices(platforms, device_type):
+    found = []
+    for platform in platforms:
+        try:
+            found += platform.get_devices(getattr(cl.device_type, device_type))
+        except cl.Error:  # DEVICE_NOT_FOUND on this platform
+            pass
+    return found
+
+
+def select_device(device_type=None, name=None, platform_index=None):
+    """First OpenCL device matching device_type and name.
+
+    device_type is a cl.device_type name ("GPU", "CPU", "ACCELERATOR",
+    "ALL") and name a case-insensitive substring of the device or platform
+    name. Both default from $JPEGCORE_OPENCL_DEVICE (either form); the type
+    then defaults to "GPU", or "ALL" when a name is given. platform_index
+    restricts the search to one platform. When no device of the requested
+    type exists, falls back to a CPU device (e.g. PoCL), then to any
+    device, with a warning.
+    """
+    setting = os.environ.get(DEVICE_ENV)
+    if setting and device_type is None and name is None:
+        if setting.upper() in ("GPU", "CPU", "ACCELERATOR", "ALL", "DEFAULT"):
+            device_type = setting.upper()
+        else:
+            name = setting
+    device_type = (device_type or ("ALL" if name else "GPU")).upper()
+
+    platforms = cl.get_platforms()
+    if platform_index is not None:
+        platforms = [platforms[platform_index]]
+
+    def matching(kind):
+        return [d for d in _devices(platforms, kind)
+                if name is None or name.lower() in d.name.lower()
+                or name.lower() in d.platform.name.lower()]
+
+    for kind in dict.fromkeys((device_type, "CPU", "ALL")):
+        found = matching(kind)
+        if found:
+            if kind != device_type:
+                warnings.warn(f"No OpenCL {device_type} device found, "
+                              f"falling back to {found[0].name} ({found[0].platform.name})")
+            return found[0]
+    raise RuntimeError(f"No OpenCL device found (type {device_type}, name {name!r})")
+
+
+# ---------- Program binary cache ----------
+def _cache_path(device, source, options, cache_dir):
+    # One binary per (platform, device, driver, build options, source)
+    key = "\0".join([device.platform.name, device.platform.version, device.name,
+                      device.driver_version, " ".join(options), source])
+    return Path(cache_dir) / (hashlib.sha256(key.encode()).hexdigest() + ".bin")
+
+
+def build_program(ctx, device, source=KERNEL_SOURCE, options=(), cache_dir=None):
+    """Build source for device, reusing an on-disk binary when one exists.
+
+    cache_dir defaults to $JPEGCORE_OPENCL_CACHE or ~/.cache/jpegcore/opencl;
+    cache_dir=False always builds from source. A binary the driver rejects
+    is rebuilt from source and replaced; failing to store it is not an error.
+    """
+    options = list(options)
+    if cache_dir is False:
+        return cl.Program(ctx, source).build(options)
+    cache_dir = cache_dir or os.environ.get(CACHE_ENV) or DEFAULT_CACHE_DIR
+    path = _cache_path(device, source, options, cache_dir)
+    if path.exists():
+        try:
+            return cl.Program(ctx, [device], [path.read_bytes()]).build(options)
+        except cl.Error:
+            pass
+    program = cl.Program(ctx, source).build(options)
+    # Best effort: an unwritable cache (read-only $HOME, ...) only costs the
+    # next start a rebuild. Write then rename, so concurrent processes never
+    # read a partial binary.
+    partial = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial.write_bytes(program.get_info(cl.program_info.BINARIES)[0])
+        partial.replace(path)
+    except OSError:
+        partial.unlink(missing_ok=True)
+    return program
+
+
+class OpenCLBackend(Backend):
+    """Kernels on one OpenCL device, chosen by select_device() from
+    device_type / device_name / platform_index or $JPEGCORE_OPENCL_DEVICE,
+    falling back to a CPU platform when no GPU is present. The program is
+    built once per instance and its binary cached on disk (cache_dir, see
+    build_program())."""
+
+    name = "opencl"
+
+    def __init__(self, platform_index=None, device_type=None, device_name=None, cache_dir=None):
+        self.device = select_device(device_type, device_name, platform_index)
+        self.ctx = cl.Context([self.device])
+        self.queue = cl.CommandQueue(self.ctx)
+        self.program = build_program(self.ctx, self.device, cache_dir=cache_dir)
+        # Retrieve each kernel once; program.<name> builds a new cl.Kernel every time
+        self.kernels = {name: cl.Kernel(self.program, name)
+                        for name in ("dct_quant", "idct_dequant", "ycbcr_to_rgb",
+                                     "downsample_channel", "upsample_channel",
+                                     "rgb_to_ycbcr_planes", "downsample_plane",
+                                     "ycbcr_planes_to_rgb")}
+        self._C = {}
+        self._Q = {}
+        self._frame = (None, None)
+
+    def dct_matrix(self, block_size):
+        # DCT matrix per block size, uploaded once (read as __constant)
+        if block_size not in self._C:
+            self._C[block_size] = cl.Buffer(
+                self.ctx, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR,
+                hostbuf=dct_matrix(block_size).astype(np.float32))
+        return self._C[block_size]
+
+    def _block_groups(self, shape, N):
+        # Global and local sizes for dct_quant/idct_dequant: one block per
+        # work-group of N x L work-items, L as large as the device allows
+        limit = min(self.kernels[name].get_work_group_info(
+                        cl.kernel_work_group_info.WORK_GROUP_SIZE, self.device)
+                    for name in ("dct_quant", "idct_dequant"))
+        L = max(1, min(N, limit // N))
+        return (shape[0], shape[1] // N * L), (N, L)
+
+    def _transform(self, queue, plane, scratch, shape, q_buf, N):
+        # DCT/quantize the padded plane into scratch, then IDCT it back in place
+        global_size, local_size = self._block_groups(shape, N)
+        tile, tmp = cl.LocalMemory(4 * N * N), cl.LocalMemory(4 * N * N)
+        for name, src, dst in (("dct_quant", plane, scratch), ("idct_dequant", scratch, plane)):
+            self.kernels[name](queue, global_size, local_size, src, dst,
+                               self.dct_matrix(N), q_buf, np.int32(N), tile, tmp)
+
+    def process_channel(self, channel, Q, block_size=8):
+        mf = cl.mem_flags
+        # One contiguous upload; the kernels work on the blocks in place
+        channel = np.ascontiguousarray(channel, dtype=np.float32)
+        q = np.ascontiguousarray(Q, dtype=np.float32).flatten()
+        plane = cl.Buffer(self.ctx, mf.READ_WRITE | mf.COPY_HOST_PTR, hostbuf=channel)
+        q_buf = cl.Buffer(self.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=q)
+        scratch = cl.Buffer(self.ctx, mf.READ_WRITE, channel.nbytes)
+        self._transform(self.queue, plane, scratch, channel.shape, q_buf, block_size)
+
+        out_img = np.empty_like(channel)
+        cl.enqueue_copy(self.queue, out_img, plane)
+        return out_img
+
+    def _quant_buffers(self, quality, block_size):
+        key = (quality, block_size)
+        if key not in self._Q:
+            self._Q[key] = [cl.Buffer(self.ctx, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR,
+                                      hostbuf=np.ascontiguousarray(Q, dtype=np.float32))
+                            for Q in quant_tables(quality, block_size)]
+        return self._Q[key]
+
+    @staticmethod
+    def _frame_shapes(h, w, N, fx, fy):
+        # Padded luma and chroma plane shapes (equal without subsampling)
+        hs, ws = -(-h // fy), -(-w // fx)
+        luma = (-(-h // N) * N, -(-w // N) * N)
+        chroma = (-(-hs // N) * N, -(-ws // N) * N) if (fx, fy) != (1, 1) else luma
+        return luma, chroma
+
+    def _allocate_frame(self, h, w, fx, fy, luma, chroma):
+        # Device buffers for one frame of the fused round trip
+        mf = cl.mem_flags
+        plane = 4 * luma[0] * luma[1]
+        buffers = {name: cl.Buffer(self.ctx, mf.READ_WRITE, plane)
+                   for name in ("Y", "Cb", "Cr", "scratch")}
+        buffers["rgb"] = cl.Buffer(self.ctx, mf.READ_ONLY, 4 * h * w * 3)
+        buffers["out"] = cl.Buffer(self.ctx, mf.WRITE_ONLY, h * w * 3)
+        if (fx, fy) != (1, 1):  # subsampled Cb, Cr, even where they pad to the luma shape
+            for name in ("Cb_small", "Cr_small"):
+                buffers[name] = cl.Buffer(self.ctx, mf.READ_WRITE, 4 * chroma[0] * chroma[1])
+        return buffers
+
+    def _enqueue_round_trip(self, queue, buf, src, dst, N, quality, fx, fy):
+        """Enqueue the fused round trip of src (float32 RGB) into dst (uint8
+        RGB) on queue without blocking; returns the download event. src and
+        dst must stay untouched until it completes.
+        """
+        h, w = src.shape[:2]
+        hs, ws = -(-h // fy), -(-w // fx)
+        luma, chroma = self._frame_shapes(h, w, N, fx, fy)
+        Q_luma, Q_chroma = self._quant_buffers(quality, N)
+        k = self.kernels
+
+        cl.enqueue_copy(queue, buf["rgb"], src, is_blocking=False)
+        k["rgb_to_ycbcr_planes"](queue, luma, None, buf["rgb"], buf["Y"], buf["Cb"],
+                                 buf["Cr"], np.int32(h), np.int32(w))
+        planes = (buf["Cb"], buf["Cr"])
+        if (fx, fy) != (1, 1):
+            planes = (buf["Cb_small"], buf["Cr_small"])
+            for full, small in zip((buf["Cb"], buf["Cr"]), planes):
+                k["downsample_plane"](queue, chroma, None, full, small, np.int32(h),
+                                      np.int32(w), np.int32(luma[1]), np.int32(fx),
+                                      np.int32(fy), np.int32(hs), np.int32(ws))
+
+        self._transform(queue, buf["Y"], buf["scratch"], luma, Q_luma, N)
+        for plane in planes:
+            self._transform(queue, plane, buf["scratch"], chroma, Q_chroma, N)
+
+        k["ycbcr_planes_to_rgb"](queue, (h, w), None, buf["Y"], *planes, buf["out"],
+                                 np.int32(luma[1]), np.int32(chroma[1]), np.int32(fx),
+                                 np.int32(fy))
+        return cl.enqueue_copy(queue, dst, buf["out"], is_blocking=False)
+
+    def compress(self, image, block_size=8, quality=50, subsampling="4:4:4", fixed_point=False):
+        """Fused round trip: one RGB upload, then colour conversion, chroma
+        downsampling, DCT/quantize, IDCT and the conversion back (with the
+        chroma upsampling folded in) all on the device, and one uint8
+        download. Frame buffers are kept for the next image of the same
+        size. fixed_point=True runs the per-channel stages instead.
+        """
+        if fixed_point:
+            return pipeline.compress_channels(self, image, block_size, quality, subsampling,
+                                              fixed_point)
+        fx, fy = subsampling_factors(subsampling)
+        h, w = image.shape[:2]
+        key = (h, w, fx, fy) + self._frame_shapes(h, w, block_size, fx, fy)
+        if self._frame[0] != key:
+            self._frame = (key, self._allocate_frame(*key))
+        rgb = np.empty((h, w, 3), dtype=np.uint8)
+        src = np.ascontiguousarray(image[:, :, :3], dtype=np.float32)
+        self._enqueue_round_trip(self.queue, self._frame[1], src, rgb, block_size, quality,
+                                 fx, fy).wait()
+        return rgb
+
+    def _prepare_slot(self, slot, h, w, N, fx, fy):
+        # (Re)allocate a stream slot's device frame and its pinned host
+        # staging arrays (ALLOC_HOST_PTR buffers, mapped once) for this size
+        key = (h, w, fx, fy) + self._frame_shapes(h, w, N, fx, fy)
+        if slot.get("key") == key:
+            return
+        self._release_slot(slot)
+        mf = cl.mem_flags
+        pinned_in = cl.Buffer(self.ctx, mf.READ_WRITE | mf.ALLOC_HOST_PTR, 4 * h * w * 3)
+        pinned_out = cl.Buffer(self.ctx, mf.READ_WRITE | mf.ALLOC_HOST_PTR, h * w * 3)
+        slot["input"], _ = cl.enqueue_map_buffer(slot["queue"], pinned_in, cl.map_flags.WRITE,
+                                                 0, (h, w, 3), np.float32)
+        slot["output"], _ = cl.enqueue_map_buffer(slot["queue"], pinned_out, cl.map_flags.READ,
+                                                  0, (h, w, 3), np.uint8)
+        slot["buffers"] = self._allocate_frame(*key)
+        slot["key"] = key
+
+    @staticmethod
+    def _release_slot(slot):
+        for name in ("input", "output"):
+            if name in slot:
+                slot.pop(name).base.release(slot["queue"])
+        slot.pop("key", None)
+
+    def compress_stream(self, images, block_size=8, quality=50, subsampling="4:4:4"):
+        """Fused round trips of an iterable of images, pipelined across images.
+
+        Two slots, each with its own command queue, device frame and pinned
+        host staging arrays, take turns: image i is copied into its slot and
+        its upload, kernels and download are enqueued without blocking; only
+        then does the generator wait for image i-1's download event and
+        yield it. The consumer's work on image i-1 (e.g. saving) and pulling
+        image i+1 from `images` (e.g. decoding it lazily) therefore overlap
+        the device work on image i. Yields uint8 RGB copies, in order.
+        """
+        fx, fy = subsampling_factors(subsampling)
+        slots = [{"queue": cl.CommandQueue(self.ctx)} for _ in range(2)]
+        pending = None
+        try:
+            for i, image in enumerate(images):
+                slot = slots[i % 2]
+                h, w = image.shape[:2]
+                self._prepare_slot(slot, h, w, block_size, fx, fy)
+                slot["input"][...] = image[:, :, :3]
+                slot["done"] = self._enqueue_round_trip(slot["queue"], slot["buffers"],
+                                                        slot["input"], slot["output"],
+                                                        block_size, quality, fx, fy)
+                if pending is not None:
+                    pending["done"].wait()
+                    yield pending["output"].copy()
+                pending = slot
+            if pending is not None:
+                pending["done"].wait()
+                yield pending["output"].copy()
+        finally:
+            for slot in slots:
+                slot["queue"].finish()
+                self._release_slot(slot)
+
+    def downsample(self, channel, fx, fy):
+        if fx == 1 and fy == 1:
+            return channel
+        mf = cl.mem_flags
+        h, w = channel.shape
+        small = np.empty((-(-h // fy), -(-w // fx)), dtype=np.float32)
+        in_buf = cl.Buffer(self.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR,
+                           hostbuf=np.ascontiguousarray(channel, dtype=np.float32))
+        out_buf = cl.Buffer(self.ctx, mf.WRITE_ONLY, small.nbytes)
+        self.kernels["downsample_channel"](self.queue, small.shape, None, in_buf, out_buf,
+                                   np.int32(h), np.int32(w), np.int32(fx), np.int32(fy))
+        cl.enqueue_copy(self.queue, small, out_buf)
+        return small
+
+    def upsample(self, channel, fx, fy, h, w):
+        if fx == 1 and fy == 1:
+            return channel[:h, :w]
+        mf = cl.mem_flags
+        channel = np.ascontiguousarray(channel, dtype=np.float32)
+        out = np.empty((h, w), dtype=np.float32)
+        in_buf = cl.Buffer(self.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=channel)
+        out_buf = cl.Buffer(self.ctx, mf.WRITE_ONLY, out.nbytes)
+        self.kernels["upsample_channel"](self.queue, (h, w), None, in_buf, out_buf,
+                                 np.int32(channel.shape[1]), np.int32(fx), np.int32(fy))
+        cl.enqueue_copy(self.queue, out, out_buf)
+        return out
+
+    def ycbcr_to_rgb(self, Y, Cb, Cr, fixed_point=False):
+        if fixed_point:
+            return super().ycbcr_to_rgb(Y, Cb, Cr, fixed_point)
+        mf = cl.mem_flags
+        h, w = Y.shape
+        size = h * w
+        Y_buf  = cl.Buffer(self.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=np.ascontiguousarray(Y, dtype=np.float32))
+        Cb_buf = cl.Buffer(self.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=np.ascontiguousarray(Cb, dtype=np.float32))
+        Cr_buf = cl.Buffer(self.ctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=np.ascontiguousarray(Cr, dtype=np.float32))
+        RGB_buf = cl.Buffer(self.ctx, mf.WRITE_ONLY, size * 3)
+
+        self.kernels["ycbcr_to_rgb"](self.queue, (size,), None,
+                                     Y_buf, Cb_buf, Cr_buf, RGB_buf, np.int32(size))
+
+        rgb = np.empty((h, w, 3), dtype=np.uint8)
+        cl.enqueue_copy(self.queue, rgb, RGB_buf)
+        return rgb
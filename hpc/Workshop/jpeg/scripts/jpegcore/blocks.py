@@ -0,0 +1,27 @@
+import numpy as np
+
+
+# ---------- Padding to a multiple of the block size ----------
+def pad_image(image, block_size=8, dtype=None):
+    # block_size: int, or (rows, cols) for non-square units such as MCUs.
+    # dtype casts while copying (uint8 samples -> float32 for the DCT).
+    bh, bw = (block_size, block_size) if np.isscalar(block_size) else block_size
+    h, w = image.shape
+    pad_h = (bh - h % bh) % bh
+    pad_w = (bw - w % bw) % bw
+    padded = np.zeros((h + pad_h, w + pad_w), dtype=dtype or image.dtype)
+    padded[:h, :w] = image
+    return padded, h, w
+
+
+# ---------- (H, W) <-> (H/b, W/b, b, b) block views ----------
+def blockify(channel, block_size=8):
+    # Strided view, no copy: blocks[i, j] is channel[i*b:(i+1)*b, j*b:(j+1)*b]
+    h, w = channel.shape
+    return channel.reshape(h // block_size, block_size,
+                           w // block_size, block_size).swapaxes(1, 2)
+
+
+def unblockify(blocks):
+    hb, wb, bh, bw = blocks.shape
+    return blocks.swapaxes(1, 2).reshape(hb * bh, wb * bw)
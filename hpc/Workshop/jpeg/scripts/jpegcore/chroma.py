@@ -0,0 +1,36 @@
+import numpy as np
+
+# ---------- Chroma subsampling modes: (horizontal, vertical) factors ----------
+SUBSAMPLING = {
+    "4:4:4": (1, 1),
+    "4:2:2": (2, 1),
+    "4:2:0": (2, 2),
+}
+
+
+def subsampling_factors(subsampling):
+    if subsampling not in SUBSAMPLING:
+        raise ValueError(f"Unknown chroma subsampling {subsampling!r}, "
+                         f"choose one of {', '.join(SUBSAMPLING)}")
+    return SUBSAMPLING[subsampling]
+
+
+# ---------- Box-filter downsampling / pixel-replication upsampling ----------
+def downsample(channel, fx, fy):
+    # Mean of each fy x fx patch; odd edges are completed by replicating
+    # the last row/column, so the result is ceil(h/fy) x ceil(w/fx)
+    if fx == 1 and fy == 1:
+        return channel
+    h, w = channel.shape
+    pad_h, pad_w = -h % fy, -w % fx
+    if pad_h or pad_w:
+        channel = np.pad(channel, ((0, pad_h), (0, pad_w)), mode='edge')
+    hs, ws = channel.shape[0] // fy, channel.shape[1] // fx
+    return channel.reshape(hs, fy, ws, fx).mean(axis=(1, 3), dtype=np.float32)
+
+
+def upsample(channel, fx, fy, h, w):
+    # Back to (h, w): every sample covers an fy x fx patch
+    if fx == 1 and fy == 1:
+        return channel[:h, :w]
+    return np.repeat(np.repeat(channel[:-(-h // fy), :-(-w // fx)], fy, axis=0), fx, axis=1)[:h, :w]
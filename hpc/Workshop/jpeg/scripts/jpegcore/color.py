@@ -0,0 +1,100 @@
+import numpy as np
+
+
+# ---------- RGB <-> YCbCr conversion (JFIF, full range) ----------
+RGB_TO_YCBCR = np.array([
+    [ 0.299,     0.587,     0.114    ],
+    [-0.168736, -0.331264,  0.5      ],
+    [ 0.5,      -0.418688, -0.081312 ],
+], dtype=np.float32)
+YCBCR_TO_RGB = np.array([
+    [1.0,  0.0,       1.402   ],
+    [1.0, -0.344136, -0.714136],
+    [1.0,  1.772,     0.0     ],
+], dtype=np.float32)
+YCBCR_OFFSET = np.array([0.0, 128.0, 128.0], dtype=np.float32)
+
+
+def rgb_to_ycbcr(image, out=None):
+    # One matmul over the (H*W, 3) pixel view instead of nine full-frame
+    # temporaries. Y, Cb, Cr are contiguous planes of out, a (3, H, W)
+    # float32 buffer that callers may pass in to reuse across images.
+    h, w = image.shape[:2]
+    if out is None:
+        out = np.empty((3, h, w), dtype=np.float32)
+    planes = out.reshape(3, h * w)
+    np.matmul(RGB_TO_YCBCR, image.reshape(h * w, -1)[:, :3].T, out=planes)
+    planes += YCBCR_OFFSET[:, None]
+    return out[0], out[1], out[2]
+
+
+def ycbcr_to_rgb(Y, Cb, Cr):
+    h, w = Y.shape
+    ycc = np.empty((h * w, 3), dtype=np.float32)
+    for k, channel in enumerate((Y, Cb, Cr)):
+        ycc[:, k] = channel.ravel()
+    ycc -= YCBCR_OFFSET
+    rgb = np.matmul(ycc, YCBCR_TO_RGB.T)
+    np.clip(rgb, 0, 255, out=rgb)
+    return rgb.astype(np.uint8).reshape(h, w, 3)
+
+
+# ---------- Fixed-point integer conversion (IJG jccolor.c / jdcolor.c) ----------
+# 16 fractional bits; uint8 in, uint8 out, no float intermediate.
+SCALEBITS = 16
+ONE_HALF = 1 << (SCALEBITS - 1)
+CBCR_OFFSET = 128 << SCALEBITS
+
+
+def _fix(x):
+    return np.floor(np.asarray(x, dtype=np.float64) * (1 << SCALEBITS) + 0.5).astype(np.int32)
+
+
+RGB_TO_YCBCR_FIXED = _fix([
+    [ 0.29900,  0.58700,  0.11400],
+    [-0.16874, -0.33126,  0.50000],
+    [ 0.50000, -0.41869, -0.08131],
+])
+# Rounding terms as in jccolor.c (ONE_HALF - 1 keeps Cb, Cr <= 255)
+YCBCR_OFFSET_FIXED = np.array([ONE_HALF, CBCR_OFFSET + ONE_HALF - 1,
+                               CBCR_OFFSET + ONE_HALF - 1], dtype=np.int32)
+# (Cb - 128, Cr - 128) -> (R, G, B) - Y
+CBCR_TO_RGB_FIXED = _fix([
+    [ 0.0,      1.40200],
+    [-0.34414, -0.71414],
+    [ 1.77200,  0.0    ],
+])
+
+
+def rgb_to_ycbcr_fixed(image, out=None):
+    # uint8 (H, W, 3) RGB -> uint8 Y, Cb, Cr planes of out (3, H, W)
+    h, w = image.shape[:2]
+    if out is None:
+        out = np.empty((3, h, w), dtype=np.uint8)
+    acc = np.matmul(RGB_TO_YCBCR_FIXED, image.reshape(h * w, -1)[:, :3].T)
+    acc += YCBCR_OFFSET_FIXED[:, None]
+    acc >>= SCALEBITS
+    out.reshape(3, h * w)[...] = acc
+    return out[0], out[1], out[2]
+
+
+def to_samples(channel):
+    # Range-limit reconstructed samples to uint8, as the IJG IDCT output does
+    if channel.dtype == np.uint8:
+        return channel
+    return np.clip(np.rint(channel), 0, 255).astype(np.uint8)
+
+
+def ycbcr_to_rgb_fixed(Y, Cb, Cr):
+    # Y, Cb, Cr: uint8 planes (see to_samples) -> uint8 (H, W, 3) RGB
+    h, w = Y.shape
+    cbcr = np.empty((2, h * w), dtype=np.int32)
+    cbcr[0] = Cb.ravel()
+    cbcr[1] = Cr.ravel()
+    cbcr -= 128
+    rgb = np.matmul(cbcr.T, CBCR_TO_RGB_FIXED.T)
+    rgb += ONE_HALF
+    rgb >>= SCALEBITS
+    rgb += Y.reshape(h * w, 1)
+    np.clip(rgb, 0, 255, out=rgb)
+    return rgb.astype(np.uint8).reshape(h, w, 3)
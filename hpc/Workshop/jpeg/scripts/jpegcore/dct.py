@@ -0,0 +1,21 @@
+import numpy as np
+
+
+# ---------- Orthonormal DCT-II matrix ----------
+def dct_matrix(N=8):
+    C = np.zeros((N, N))
+    for k in range(N):
+        for n in range(N):
+            alpha = np.sqrt(1/N) if k == 0 else np.sqrt(2/N)
+            C[k, n] = alpha * np.cos(np.pi * (2*n + 1) * k / (2 * N))
+    return C
+
+
+# ---------- Batched block transform over a (H/b, W/b, b, b) tensor ----------
+def dct_quant_blocks(blocks, Q, C):
+    # Level shift, 2-D DCT of every block at once (broadcast matmul), quantize
+    return np.round((C @ (blocks - 128) @ C.T) / Q)
+
+
+def idct_dequant_blocks(quantized, Q, C):
+    return C.T @ (quantized * Q) @ C + 128
@@ -0,0 +1,206 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pure-Python fallback, same results, much slower
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+# Huffman table slots used by the symbol stream
+DC_LUMA_T, AC_LUMA_T, DC_CHROMA_T, AC_CHROMA_T = range(4)
+
+
+# ---------- Vectorized symbol generation ----------
+def magnitude(values):
+    # JPEG size category and additional bits, for whole arrays at once
+    values = np.asarray(values, dtype=np.int64)
+    size = np.frexp(np.abs(values).astype(np.float64))[1].astype(np.int64)
+    bits = np.where(values >= 0, values, values + (1 << size) - 1)
+    return size, bits
+
+
+def scan_symbols(zz, dc_tables, ac_tables, dc_pred=None):
+    """Symbol stream for blocks already in scan order.
+
+    zz: (nblocks, 64) zigzag coefficients in the order they are coded
+    (MCU interleaved). dc_tables/ac_tables: per-block table slot.
+    dc_pred: per-block index of the previous block of the same component
+    (-1 starts a new prediction chain). Returns (table, symbol, bits, nbits)
+    arrays in bitstream order.
+    """
+    zz = np.asarray(zz, dtype=np.int64)
+    nblocks = zz.shape[0]
+
+    # DC: difference to the previous block of the same component
+    prev_dc = np.where(dc_pred >= 0, zz[np.maximum(dc_pred, 0), 0], 0)
+    dc_size, dc_bits = magnitude(zz[:, 0] - prev_dc)
+
+    # AC: one event per nonzero coefficient, preceded by 15-zero ZRLs
+    block, k = np.nonzero(zz[:, 1:])
+    k += 1
+    first = np.ones(len(k), dtype=bool)
+    first[1:] = block[1:] != block[:-1]
+    prev_k = np.where(first, 0, np.roll(k, 1))
+    run = k - prev_k - 1
+    n_zrl = run // 16
+    ac_size, ac_bits = magnitude(zz[block, k])
+    ac_symbol = ((run % 16) << 4) | ac_size
+
+    # EOB after the last nonzero unless it is coefficient 63
+    last_k = np.zeros(nblocks, dtype=np.int64)
+    last_k[block] = k  # nonzero() is block-major, so the last write wins
+    eob_blocks = np.nonzero(last_k < 63)[0]
+
+    zrl_event = np.repeat(np.arange(len(k)), n_zrl)
+
+    # Merge DC, ZRL, AC and EOB events; sort by (block, position in block)
+    events_block = np.concatenate([np.arange(nblocks), block[zrl_event], block, eob_blocks])
+    events_pos = np.concatenate([
+        np.zeros(nblocks),
+        k[zrl_event] - 0.5,
+        k.astype(np.float64),
+        np.full(len(eob_blocks), 64.0),
+    ])
+    order = np.lexsort((events_pos, events_block))
+
+    table = np.concatenate([dc_tables, ac_tables[block[zrl_event]], ac_tables[block],
+                            ac_tables[eob_blocks]])
+    symbol = np.concatenate([dc_size, np.full(len(zrl_event), 0xF0), ac_symbol,
+                             np.zeros(len(eob_blocks), dtype=np.int64)])
+    bits = np.concatenate([dc_bits, np.zeros(len(zrl_event), dtype=np.int64), ac_bits,
+                           np.zeros(len(eob_blocks), dtype=np.int64)])
+    nbits = np.concatenate([dc_size, np.zeros(len(zrl_event), dtype=np.int64), ac_size,
+                            np.zeros(len(eob_blocks), dtype=np.int64)])
+    return table[order], symbol[order], bits[order], nbits[order]
+
+
+# ---------- Huffman tables ----------
+def code_table(table):
+    # Canonical codes (Annex C) as lookup arrays: symbol -> code, length
+    bits, values = table
+    codes = np.zeros(256, dtype=np.int64)
+    lengths = np.zeros(256, dtype=np.int64)
+    code = 0
+    k = 0
+    for length in range(1, 17):
+        for _ in range(bits[length - 1]):
+            codes[values[k]] = code
+            lengths[values[k]] = length
+            code += 1
+            k += 1
+        code <<= 1
+    return codes, lengths
+
+
+def optimal_table(freq):
+    """(BITS, HUFFVAL) for a 256-bin symbol histogram (Annex K.2).
+
+    Code lengths are capped at 16 and the all-ones code is reserved, as
+    baseline JPEG requires.
+    """
+    freq = list(np.asarray(freq, dtype=np.int64)) + [1]  # reserved symbol 256
+    codesize = [0] * 257
+    others = [-1] * 257
+    while True:
+        # Two least frequent nonzero entries, preferring the larger index on ties
+        candidates = [(f, -i) for i, f in enumerate(freq) if f > 0]
+        if len(candidates) < 2:
+            break
+        candidates.sort()
+        v1, v2 = -candidates[0][1], -candidates[1][1]
+        freq[v1] += freq[v2]
+        freq[v2] = 0
+        codesize[v1] += 1
+        while others[v1] >= 0:
+            v1 = others[v1]
+            codesize[v1] += 1
+        others[v1] = v2
+        codesize[v2] += 1
+        while others[v2] >= 0:
+            v2 = others[v2]
+            codesize[v2] += 1
+
+    bits = [0] * 33
+    for size in codesize:
+        if size:
+            bits[size] += 1
+    # Limit code lengths to 16 bits
+    i = 32
+    while i > 16:
+        while bits[i] > 0:
+            j = i - 2
+            while bits[j] == 0:
+                j -= 1
+            bits[i] -= 2
+            bits[i - 1] += 1
+            bits[j + 1] += 2
+            bits[j] -= 1
+        i -= 1
+    while bits[i] == 0:
+        i -= 1
+    bits[i] -= 1  # drop the reserved code
+
+    values = [s for size in range(1, 33) for s in range(256) if codesize[s] == size]
+    return bits[1:17], values
+
+
+def symbol_histogram(table, symbol):
+    # (4, 256) symbol counts per table slot; histograms of separately coded
+    # segments (or ranks) simply add up
+    return np.bincount(table * 256 + symbol, minlength=4 * 256).reshape(4, 256)
+
+
+def optimal_tables(histogram):
+    # One optimized table per slot
+    return [optimal_table(histogram[t]) for t in range(4)]
+
+
+# ---------- Bit packing ----------
+@njit(nogil=True, cache=True)
+def pack_bits(codes, lengths, out):
+    # codes/lengths: per event Huffman code followed by its additional bits;
+    # writes the byte-stuffed entropy-coded segment into out, returns its size
+    acc = 0
+    nbits = 0
+    n = 0
+    for e in range(codes.shape[0]):
+        acc = (acc << lengths[e]) | codes[e]
+        nbits += lengths[e]
+        while nbits >= 8:
+            nbits -= 8
+            byte = (acc >> nbits) & 0xFF
+            out[n] = byte
+            n += 1
+            if byte == 0xFF:
+                out[n] = 0
+                n += 1
+        acc &= (1 << nbits) - 1
+    if nbits > 0:
+        # Pad the last byte with 1-bits
+        pad = 8 - nbits
+        byte = ((acc << pad) | ((1 << pad) - 1)) & 0xFF
+        out[n] = byte
+        n += 1
+        if byte == 0xFF:
+            out[n] = 0
+            n += 1
+    return n
+
+
+def encode_symbols(table, symbol, bits, nbits, huffman_tables):
+    # pack_bits releases the GIL, so segments can be packed on a thread pool
+    code_tables = [code_table(t) for t in huffman_tables]
+    huff_code = np.empty(len(symbol), dtype=np.int64)
+    huff_len = np.empty(len(symbol), dtype=np.int64)
+    for t, (codes, lengths) in enumerate(code_tables):
+        sel = table == t
+        huff_code[sel] = codes[symbol[sel]]
+        huff_len[sel] = lengths[symbol[sel]]
+    # Merge each Huffman code with its additional bits (at most 16 + 11 bits)
+    codes = (huff_code << nbits) | bits
+    lengths = huff_len + nbits
+    out = np.empty(int(lengths.sum()) // 4 + 16, dtype=np.uint8)  # room for stuffing
+    n = pack_bits(codes, lengths, out)
+    return out[:n].tobytes()
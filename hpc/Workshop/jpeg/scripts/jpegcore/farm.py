@@ -0,0 +1,140 @@
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+from mpi4py import MPI
+
+from .pipeline import compress_file, encode_file
+
+# Message tags between the dispatcher (rank 0) and the workers
+TAG_TASK, TAG_STOP, TAG_RESULT = 1, 2, 3
+
+
+def output_paths(paths, out_dir, encode=False, root=None):
+    """Output file of every input path, none of them shared.
+
+    Each input's place under root (default: the inputs' common directory)
+    is mirrored under out_dir, so a/DSC_0001.png and b/DSC_0001.png stay
+    apart. Inputs that would still meet (x.nef next to x.png) keep their
+    own suffix instead: x.nef.jpeg, x.png.jpeg.
+    """
+    paths = [Path(path) for path in paths]
+    if not paths:
+        return []
+    root = Path(root) if root is not None else Path(os.path.commonpath([p.parent for p in paths]))
+    suffix = ".jpg" if encode else ".jpeg"
+    relative = [path.relative_to(root) for path in paths]
+    outputs = [Path(out_dir) / rel.with_suffix(suffix) for rel in relative]
+    taken = Counter(outputs)
+    outputs = [Path(out_dir) / rel.with_name(rel.name + suffix) if taken[out] > 1 else out
+               for rel, out in zip(relative, outputs)]
+    if len(set(outputs)) < len(outputs):
+        raise ValueError("Input paths map to the same output file")
+    return outputs
+
+
+def process_file(path, out_dir, encode=False, out_path=None, **options):
+    """Run the whole pipeline on one file; returns its statistics.
+
+    encode=True writes a real JFIF file with encode_file(), otherwise the
+    compress() round trip is saved with compress_file(). out_path defaults
+    to the input's stem in out_dir. options are passed on (backend,
+    quality, subsampling, ...).
+    """
+    path = Path(path)
+    if out_path is None:
+        out_path = Path(out_dir) / (path.stem + (".jpg" if encode else ".jpeg"))
+    out_path = Path(out_path)
+    start = time.perf_counter()
+    if encode:
+        encode_file(path, out_path, **options)
+    else:
+        compress_file(path, out_path, **options)
+    seconds = time.perf_counter() - start
+    return {
+        "path": str(path),
+        "output": str(out_path),
+        "seconds": seconds,
+        "input_bytes": path.stat().st_size,
+        "output_bytes": out_path.stat().st_size,
+    }
+
+
+def try_process_file(path, out_dir, encode=False, out_path=None, **options):
+    # process_file() statistics, or {"path": ..., "error": message} so that
+    # one unreadable file does not take its worker (and the farm) down
+    try:
+        return process_file(path, out_dir, encode, out_path, **options)
+    except Exception as exc:  # reported back to rank 0
+        return {"path": str(path), "error": f"{type(exc).__name__}: {exc}"}
+
+
+def farm_files(paths, out_dir, comm=None, encode=False, root=None, **options):
+    """Task farm: rank 0 hands file paths to the other ranks on demand.
+
+    Every rank must call this; paths and root only matter on rank 0.
+    Outputs are named by output_paths(), mirroring the inputs under root.
+    Workers run the full per-image pipeline locally (with their own backend
+    instance), so only paths and statistics cross the network, never
+    pixels. Returns the per-file statistics in completion order on rank 0,
+    None elsewhere; a file that fails gives {"path", "error", "rank"}
+    instead. On a single rank, rank 0 processes every file itself.
+    """
+    comm = comm if comm is not None else MPI.COMM_WORLD
+    rank, size = comm.Get_rank(), comm.Get_size()
+
+    if rank != 0:
+        status = MPI.Status()
+        while True:
+            task = comm.recv(source=0, tag=MPI.ANY_TAG, status=status)
+            if status.Get_tag() == TAG_STOP:
+                return None
+            path, out_path = task
+            stats = try_process_file(path, out_dir, encode, out_path, **options)
+            stats["rank"] = rank
+            comm.send(stats, dest=0, tag=TAG_RESULT)
+
+    paths = [str(path) for path in paths]
+    tasks = zip(paths, map(str, output_paths(paths, out_dir, encode, root)))
+    if size == 1:
+        return [dict(try_process_file(path, out_dir, encode, out_path, **options), rank=0)
+                for path, out_path in tasks]
+
+    def send_next(dest):
+        task = next(tasks, None)
+        if task is None:
+            comm.send(None, dest=dest, tag=TAG_STOP)
+            return False
+        comm.send(task, dest=dest, tag=TAG_TASK)
+        return True
+
+    results = []
+    active = sum(send_next(dest) for dest in range(1, size))
+    status = MPI.Status()
+    while active:
+        results.append(comm.recv(source=MPI.ANY_SOURCE, tag=TAG_RESULT, status=status))
+        active -= not send_next(status.Get_source())
+    return results
+
+
+def summarize(results, wall_seconds):
+    # Totals for a farm run: files, bytes in/out, per-file and aggregate
+    # rates over the files that succeeded; failures are only counted
+    failed = sum("error" in r for r in results)
+    results = [r for r in results if "error" not in r]
+    n = len(results)
+    busy = sum(r["seconds"] for r in results)
+    size_in = sum(r["input_bytes"] for r in results)
+    size_out = sum(r["output_bytes"] for r in results)
+    return {
+        "files": n,
+        "failed": failed,
+        "wall_seconds": wall_seconds,
+        "busy_seconds": busy,
+        "mean_seconds": busy / n if n else 0.0,
+        "files_per_second": n / wall_seconds if wall_seconds else 0.0,
+        "input_bytes": size_in,
+        "output_bytes": size_out,
+        "ratio": size_in / size_out if size_out else 0.0,
+    }
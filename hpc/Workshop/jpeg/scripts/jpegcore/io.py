@@ -0,0 +1,46 @@
+import numpy as np
+from pathlib import Path
+
+RAW_SUFFIXES = {".nef", ".cr2", ".cr3", ".arw", ".dng", ".raf", ".orf", ".rw2"}
+IMAGE_SUFFIXES = RAW_SUFFIXES | {".png"}
+
+
+def find_images(directory, suffixes=IMAGE_SUFFIXES):
+    # Sorted image paths under directory (recursive), matched case-insensitively
+    return sorted(p for p in Path(directory).rglob("*")
+                  if p.is_file() and p.suffix.lower() in suffixes)
+
+
+# ---------- Load image as float32 (or uint8, dtype=np.uint8) RGB ----------
+def load_raw_image(path, dtype=np.float32):
+    import rawpy  # Library to read raw images
+
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"❌ RAW image not found: {path}")
+    with rawpy.imread(str(path)) as raw:  # rawpy requires a string path
+        rgb = raw.postprocess()
+    return rgb.astype(dtype, copy=False)
+
+
+def load_png_image(path, dtype=np.float32):
+    import imageio.v2 as imageio
+
+    rgb = imageio.imread(Path(path))
+    return np.ascontiguousarray(rgb[:, :, :3], dtype=dtype)
+
+
+def load_image(path, dtype=np.float32):
+    if Path(path).suffix.lower() in RAW_SUFFIXES:
+        return load_raw_image(path, dtype)
+    return load_png_image(path, dtype)
+
+
+# ---------- Save uint8 RGB ----------
+def save_image(path, rgb, quality=75):
+    from PIL import Image
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(rgb).save(path, quality=quality)
+    return path
@@ -0,0 +1,280 @@
+import struct
+from functools import partial
+
+import numpy as np
+
+from .entropy import (AC_CHROMA_T, AC_LUMA_T, DC_CHROMA_T, DC_LUMA_T, encode_symbols,
+                      optimal_tables, scan_symbols, symbol_histogram)
+
+# ---------- Zigzag scan order (index into a row-major 8x8 block) ----------
+ZIGZAG = np.array([
+     0,  1,  8, 16,  9,  2,  3, 10,
+    17, 24, 32, 25, 18, 11,  4,  5,
+    12, 19, 26, 33, 40, 48, 41, 34,
+    27, 20, 13,  6,  7, 14, 21, 28,
+    35, 42, 49, 56, 57, 50, 43, 36,
+    29, 22, 15, 23, 30, 37, 44, 51,
+    58, 59, 52, 45, 38, 31, 39, 46,
+    53, 60, 61, 54, 47, 55, 62, 63,
+])
+
+# ---------- Standard Huffman tables (ITU T.81 Annex K.3) ----------
+# (BITS: number of codes of length 1..16, HUFFVAL: symbols in code order)
+DC_LUMA = (
+    [0, 1, 5, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0],
+    list(range(12)),
+)
+DC_CHROMA = (
+    [0, 3, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0],
+    list(range(12)),
+)
+AC_LUMA = (
+    [0, 2, 1, 3, 3, 2, 4, 3, 5, 5, 4, 4, 0, 0, 1, 0x7d],
+    [
+        0x01, 0x02, 0x03, 0x00, 0x04, 0x11, 0x05, 0x12, 0x21, 0x31, 0x41, 0x06, 0x13, 0x51, 0x61, 0x07,
+        0x22, 0x71, 0x14, 0x32, 0x81, 0x91, 0xa1, 0x08, 0x23, 0x42, 0xb1, 0xc1, 0x15, 0x52, 0xd1, 0xf0,
+        0x24, 0x33, 0x62, 0x72, 0x82, 0x09, 0x0a, 0x16, 0x17, 0x18, 0x19, 0x1a, 0x25, 0x26, 0x27, 0x28,
+        0x29, 0x2a, 0x34, 0x35, 0x36, 0x37, 0x38, 0x39, 0x3a, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48, 0x49,
+        0x4a, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5a, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68, 0x69,
+        0x6a, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79, 0x7a, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89,
+        0x8a, 0x92, 0x93, 0x94, 0x95, 0x96, 0x97, 0x98, 0x99, 0x9a, 0xa2, 0xa3, 0xa4, 0xa5, 0xa6, 0xa7,
+        0xa8, 0xa9, 0xaa, 0xb2, 0xb3, 0xb4, 0xb5, 0xb6, 0xb7, 0xb8, 0xb9, 0xba, 0xc2, 0xc3, 0xc4, 0xc5,
+        0xc6, 0xc7, 0xc8, 0xc9, 0xca, 0xd2, 0xd3, 0xd4, 0xd5, 0xd6, 0xd7, 0xd8, 0xd9, 0xda, 0xe1, 0xe2,
+        0xe3, 0xe4, 0xe5, 0xe6, 0xe7, 0xe8, 0xe9, 0xea, 0xf1, 0xf2, 0xf3, 0xf4, 0xf5, 0xf6, 0xf7, 0xf8,
+        0xf9, 0xfa,
+    ],
+)
+AC_CHROMA = (
+    [0, 2, 1, 2, 4, 4, 3, 4, 7, 5, 4, 4, 0, 1, 2, 0x77],
+    [
+        0x00, 0x01, 0x02, 0x03, 0x11, 0x04, 0x05, 0x21, 0x31, 0x06, 0x12, 0x41, 0x51, 0x07, 0x61, 0x71,
+        0x13, 0x22, 0x32, 0x81, 0x08, 0x14, 0x42, 0x91, 0xa1, 0xb1, 0xc1, 0x09, 0x23, 0x33, 0x52, 0xf0,
+        0x15, 0x62, 0x72, 0xd1, 0x0a, 0x16, 0x24, 0x34, 0xe1, 0x25, 0xf1, 0x17, 0x18, 0x19, 0x1a, 0x26,
+        0x27, 0x28, 0x29, 0x2a, 0x35, 0x36, 0x37, 0x38, 0x39, 0x3a, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48,
+        0x49, 0x4a, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5a, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68,
+        0x69, 0x6a, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79, 0x7a, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87,
+        0x88, 0x89, 0x8a, 0x92, 0x93, 0x94, 0x95, 0x96, 0x97, 0x98, 0x99, 0x9a, 0xa2, 0xa3, 0xa4, 0xa5,
+        0xa6, 0xa7, 0xa8, 0xa9, 0xaa, 0xb2, 0xb3, 0xb4, 0xb5, 0xb6, 0xb7, 0xb8, 0xb9, 0xba, 0xc2, 0xc3,
+        0xc4, 0xc5, 0xc6, 0xc7, 0xc8, 0xc9, 0xca, 0xd2, 0xd3, 0xd4, 0xd5, 0xd6, 0xd7, 0xd8, 0xd9, 0xda,
+        0xe2, 0xe3, 0xe4, 0xe5, 0xe6, 0xe7, 0xe8, 0xe9, 0xea, 0xf2, 0xf3, 0xf4, 0xf5, 0xf6, 0xf7, 0xf8,
+        0xf9, 0xfa,
+    ],
+)
+
+
+# ---------- Marker segments ----------
+def _segment(marker, payload):
+    return struct.pack(">BBH", 0xFF, marker, len(payload) + 2) + payload
+
+
+def app0_jfif():
+    return _segment(0xE0, b"JFIF\x00" + struct.pack(">BBBHHBB", 1, 1, 0, 1, 1, 0, 0))
+
+
+def dqt(table_id, Q):
+    values = np.asarray(Q, dtype=np.uint8).ravel()[ZIGZAG]
+    return _segment(0xDB, bytes([table_id]) + values.tobytes())
+
+
+def dht(table_class, table_id, table):
+    bits, values = table
+    return _segment(0xC4, bytes([(table_class << 4) | table_id] + list(bits) + list(values)))
+
+
+def sof0(height, width, components):
+    # components: (id, sampling byte, quant table id)
+    payload = struct.pack(">BHHB", 8, height, width, len(components))
+    for cid, sampling, qt in components:
+        payload += bytes([cid, sampling, qt])
+    return _segment(0xC0, payload)
+
+
+def dri(restart_interval):
+    return _segment(0xDD, struct.pack(">H", restart_interval))
+
+
+def max_restart_rows(mcus_per_row):
+    # DRI holds the interval length in MCUs as 16 bits
+    return 0xFFFF // mcus_per_row
+
+
+def check_restart_rows(restart_rows, mcus_per_row):
+    limit = max_restart_rows(mcus_per_row)
+    if restart_rows > limit:
+        raise ValueError(f"restart_rows={restart_rows} exceeds {limit}: a restart interval "
+                         f"holds at most 65535 MCUs ({mcus_per_row} per MCU row)")
+
+
+def sos(components):
+    # components: (id, dc table id, ac table id)
+    payload = bytes([len(components)])
+    for cid, dc, ac in components:
+        payload += bytes([cid, (dc << 4) | ac])
+    return _segment(0xDA, payload + bytes([0, 63, 0]))
+
+
+def to_zigzag(quantized_blocks):
+    # (Hb, Wb, 8, 8) -> (Hb, Wb, 64) integer coefficients in zigzag order
+    hb, wb = quantized_blocks.shape[:2]
+    return quantized_blocks.reshape(hb, wb, 64)[:, :, ZIGZAG].astype(np.int32)
+
+
+def component_sampling(sampling=(1, 1)):
+    # (h, v) blocks per MCU for Y, Cb, Cr; chroma always has one block
+    return [tuple(sampling), (1, 1), (1, 1)]
+
+
+def interleave(components, sampling=None):
+    # MCU order: the h x v blocks of each component covering one MCU (row
+    # major), component after component, then the next MCU. sampling: per
+    # component (h, v), default 4:4:4. Returns (nblocks, 64) coefficients,
+    # per-block component index and the index of the previous block of the
+    # same component (DC predictor, -1 for the first one).
+    sampling = sampling or [(1, 1)] * len(components)
+    per_mcu = []
+    for c, (sh, sv) in zip(components, sampling):
+        mr, mc = c.shape[0] // sv, c.shape[1] // sh
+        per_mcu.append(c.reshape(mr, sv, mc, sh, 64).transpose(0, 2, 1, 3, 4)
+                        .reshape(mr * mc, sv * sh, 64))
+    zz = np.concatenate(per_mcu, axis=1).reshape(-1, 64)
+    counts = [sh * sv for sh, sv in sampling]
+    comp = np.tile(np.repeat(np.arange(len(components)), counts), zz.shape[0] // sum(counts))
+    dc_pred = np.empty(zz.shape[0], dtype=np.int64)
+    for k in range(len(components)):
+        blocks = np.flatnonzero(comp == k)
+        dc_pred[blocks] = np.concatenate(([-1], blocks[:-1]))
+    return zz, comp, dc_pred
+
+
+# ---------- Scan segments (restart intervals) ----------
+DC_SLOTS = np.array([DC_LUMA_T, DC_CHROMA_T, DC_CHROMA_T])
+AC_SLOTS = np.array([AC_LUMA_T, AC_CHROMA_T, AC_CHROMA_T])
+STANDARD_TABLES = [DC_LUMA, AC_LUMA, DC_CHROMA, AC_CHROMA]
+
+
+def scan_segment(components, sampling=None):
+    # Symbol stream of one independently coded segment; the DC predictors
+    # start from zero, as they do after every RSTn marker
+    zz, comp, dc_pred = interleave(components, sampling)
+    return scan_symbols(zz, DC_SLOTS[comp], AC_SLOTS[comp], dc_pred)
+
+
+def interval_components(components, restart_rows=0, start_row=0, stop_row=None,
+                        sampling=(1, 1)):
+    """Component slices of every restart interval of restart_rows MCU rows
+    (0: one interval), each codable on its own with scan_segment().
+
+    components: per component (Hb, Wb, 64) zigzag blocks. start_row and
+    stop_row select a range of MCU rows, so a worker or rank can build only
+    its own intervals. sampling: luma (h, v) blocks per MCU.
+    """
+    sampling = component_sampling(sampling)
+    stop_row = components[0].shape[0] // sampling[0][1] if stop_row is None else stop_row
+    step = restart_rows or stop_row - start_row
+    return [[c[r * sv:min(r + step, stop_row) * sv] for c, (_, sv) in zip(components, sampling)]
+            for r in range(start_row, stop_row, step)]
+
+
+def scan_segments(components, restart_rows=0, start_row=0, stop_row=None, sampling=(1, 1),
+                  map=map):
+    # Symbols per restart interval (see interval_components), built through map
+    intervals = interval_components(components, restart_rows, start_row, stop_row, sampling)
+    return list(map(partial(scan_segment, sampling=component_sampling(sampling)), intervals))
+
+
+def segment_histogram(segment):
+    table, symbol, _, _ = segment
+    return symbol_histogram(table, symbol)
+
+
+def segments_histogram(segments, map=map):
+    return sum(map(segment_histogram, segments))
+
+
+def pack_segment(segment, huffman_tables):
+    return encode_symbols(*segment, huffman_tables)
+
+
+def pack_segments(segments, huffman_tables, map=map):
+    # map: builtin map, ThreadPoolExecutor.map, Pool.map, ...
+    return list(map(partial(pack_segment, huffman_tables=huffman_tables), segments))
+
+
+def code_interval(components, huffman_tables, sampling):
+    # Symbols and bits of one restart interval in a single task
+    return pack_segment(scan_segment(components, sampling), huffman_tables)
+
+
+def jfif_header(height, width, Q_luma, Q_chroma, huffman_tables, restart_interval=0,
+                sampling=(1, 1)):
+    # SOI up to and including SOS: everything before the entropy-coded data
+    dc_luma, ac_luma, dc_chroma, ac_chroma = huffman_tables
+    parts = [
+        b"\xFF\xD8",  # SOI
+        app0_jfif(),
+        dqt(0, Q_luma),
+        dqt(1, Q_chroma),
+        sof0(height, width, [(1, (sampling[0] << 4) | sampling[1], 0), (2, 0x11, 1), (3, 0x11, 1)]),
+        dht(0, 0, dc_luma),
+        dht(1, 0, ac_luma),
+        dht(0, 1, dc_chroma),
+        dht(1, 1, ac_chroma),
+    ]
+    if restart_interval:
+        parts.append(dri(restart_interval))
+    parts.append(sos([(1, 0, 0), (2, 1, 1), (3, 1, 1)]))
+    return b"".join(parts)
+
+
+def join_segments(segments, first=0):
+    # Segments number first, first + 1, ... of the scan; every one but the
+    # scan's first is preceded by its marker RST((m - 1) % 8)
+    parts = []
+    for m, segment in enumerate(segments, first):
+        if m:
+            parts.append(bytes([0xFF, 0xD0 + (m - 1) % 8]))
+        parts.append(segment)
+    return b"".join(parts)
+
+
+EOI = b"\xFF\xD9"
+
+
+def assemble_jfif(height, width, Q_luma, Q_chroma, huffman_tables, segments,
+                  restart_interval=0, sampling=(1, 1)):
+    # Headers, then the entropy-coded segments separated by RST0..RST7
+    return (jfif_header(height, width, Q_luma, Q_chroma, huffman_tables, restart_interval,
+                        sampling)
+            + join_segments(segments) + EOI)
+
+
+def write_jfif(height, width, Y_blocks, Cb_blocks, Cr_blocks, Q_luma, Q_chroma,
+               optimize=False, restart_rows=0, map=map, sampling=(1, 1)):
+    """Baseline sequential JFIF file from quantized 8x8 blocks.
+
+    optimize=True replaces the Annex K Huffman tables with tables built from
+    this image's symbol histograms (smaller file, same pixels).
+    restart_rows > 0 inserts a restart marker every restart_rows MCU rows;
+    the intervals are coded independently through map: symbols and bits as
+    one task each, or with optimize, symbols and histograms first, then
+    bits once the tables are known.
+    sampling: luma (h, v) blocks per MCU, (2, 2) for 4:2:0 and (2, 1) for
+    4:2:2; the chroma blocks are already downsampled. ValueError if an
+    interval would exceed the 65535 MCUs that DRI can express.
+    """
+    # One chroma block per MCU, so the chroma block width is MCUs per row
+    mcus_per_row = Cb_blocks.shape[1]
+    check_restart_rows(restart_rows, mcus_per_row)
+    components = [to_zigzag(b) for b in (Y_blocks, Cb_blocks, Cr_blocks)]
+    if optimize:
+        segments = scan_segments(components, restart_rows, sampling=sampling, map=map)
+        huffman_tables = optimal_tables(segments_histogram(segments, map))
+        packed = pack_segments(segments, huffman_tables, map)
+    else:
+        huffman_tables = STANDARD_TABLES
+        intervals = interval_components(components, restart_rows, sampling=sampling)
+        packed = list(map(partial(code_interval, huffman_tables=huffman_tables,
+                                  sampling=component_sampling(sampling)), intervals))
+    restart_interval = restart_rows * mcus_per_row
+    return assemble_jfif(height, width, Q_luma, Q_chroma, huffman_tables, packed,
+                         restart_interval, sampling)
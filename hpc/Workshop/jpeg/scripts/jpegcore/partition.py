@@ -0,0 +1,26 @@
+import numpy as np
+
+
+# ---------- Block-aligned work partitioning ----------
+# Work is split in stripes of `unit` rows (a block row, or an MCU row with
+# chroma subsampling), never mid-block, so no block is owned by two ranks
+# or by none.
+def balanced_counts(n, parts):
+    # n work units over parts; the first n % parts parts take one extra
+    base, extra = divmod(n, parts)
+    return [base + (p < extra) for p in range(parts)]
+
+
+def stripe_bounds(h, unit, parts):
+    """Row bounds of `parts` contiguous bands of whole stripes.
+
+    Part p owns rows bounds[p]:bounds[p+1]. Stripe counts differ by at most
+    one; only the last non-empty band can end mid-stripe (at h).
+    """
+    counts = balanced_counts(-(-h // unit), parts)
+    return np.minimum(np.cumsum([0] + counts) * unit, h)
+
+
+def chunk_bounds(h, unit, chunk_stripes=1):
+    # Equal chunks of chunk_stripes stripes, handed out on demand
+    return np.append(np.arange(0, h, unit * chunk_stripes), h)
@@ -0,0 +1,185 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .backends import get_backend
+from .blocks import pad_image
+from .chroma import subsampling_factors
+from .io import load_image, save_image
+from .jfif import write_jfif
+from .quant import quant_tables
+from .timing import phase
+
+
+def compress(image, backend="numpy", block_size=8, quality=50, subsampling="4:4:4",
+             fixed_point=False, **options):
+    """Run the JPEG round trip (YCbCr, DCT, quantize, IDCT, RGB) on one image.
+
+    image: (H, W, 3) RGB array. backend: a name from BACKENDS or a Backend
+    instance; extra keyword options are passed to the backend constructor.
+    quality=50 uses the standard Annex K tables unscaled. subsampling
+    "4:2:2" or "4:2:0" transforms Cb and Cr at half width (and height),
+    then upsamples them before the conversion back. fixed_point=True
+    converts colours with the IJG integer arithmetic on uint8 samples
+    (pass the image as loaded with dtype=np.uint8). Returns uint8 RGB
+    (on the MPI backend: on rank 0, which alone needs to hold image).
+    """
+    engine = get_backend(backend, **options)
+    if hasattr(engine, "compress"):
+        # Distributed backends scatter the image themselves; fused backends
+        # keep it on their device for the whole round trip
+        return engine.compress(image, block_size, quality, subsampling, fixed_point)
+    return compress_channels(engine, image, block_size, quality, subsampling, fixed_point)
+
+
+def compress_channels(engine, image, block_size=8, quality=50, subsampling="4:4:4",
+                      fixed_point=False):
+    # The round trip as a sequence of the engine's per-channel stages
+    Q_luma, Q_chroma = quant_tables(quality, block_size)
+    fx, fy = subsampling_factors(subsampling)
+
+    with phase("color"):
+        Y, Cb, Cr = engine.rgb_to_ycbcr(image, fixed_point)
+    h, w = Y.shape
+
+    with phase("pad"):
+        padded, _, _ = pad_image(Y, block_size, np.float32)
+    with phase("dct"):
+        channels = [engine.process_channel(padded, Q_luma, block_size)[:h, :w]]
+    for channel in (Cb, Cr):
+        with phase("resample"):
+            small = engine.downsample(channel, fx, fy)
+        hs, ws = small.shape
+        with phase("pad"):
+            padded, _, _ = pad_image(small, block_size, np.float32)
+        with phase("dct"):
+            small = engine.process_channel(padded, Q_chroma, block_size)[:hs, :ws]
+        with phase("resample"):
+            channels.append(engine.upsample(small, fx, fy, h, w))
+    with phase("color"):
+        return engine.ycbcr_to_rgb(*channels, fixed_point=fixed_point)
+
+
+def quantize_components(engine, image, Q_luma, Q_chroma, subsampling="4:4:4",
+                        fixed_point=False):
+    """Quantized 8x8 blocks of Y, Cb and Cr for the entropy coder.
+
+    Y is padded to whole MCUs (8*fy x 8*fx pixels) and the downsampled
+    chroma to whole blocks, so every component has the same MCU grid.
+    """
+    fx, fy = subsampling_factors(subsampling)
+    with phase("color"):
+        Y, Cb, Cr = engine.rgb_to_ycbcr(image, fixed_point)
+    with phase("pad"):
+        padded, _, _ = pad_image(Y, (8 * fy, 8 * fx), np.float32)
+    with phase("dct"):
+        quantized = [engine.quantize_channel(padded, Q_luma, 8)]
+    for channel in (Cb, Cr):
+        with phase("resample"):
+            small = engine.downsample(channel, fx, fy)
+        with phase("pad"):
+            padded, _, _ = pad_image(small, 8, np.float32)
+        with phase("dct"):
+            quantized.append(engine.quantize_channel(padded, Q_chroma, 8))
+    return quantized
+
+
+def encode_jpeg(image, backend="numpy", quality=50, optimize=False, restart_rows=0,
+                workers=None, subsampling="4:4:4", fixed_point=False, **options):
+    """Encode image as a baseline JFIF file straight from the quantized DCT.
+
+    Unlike compress() there is no IDCT, no conversion back to RGB and no
+    second encode by PIL: the coefficients are entropy coded directly.
+    optimize=True builds per-image Huffman tables. restart_rows > 0 splits
+    the scan into restart intervals of that many MCU rows, which are
+    Huffman coded on a pool of `workers` threads. subsampling sets the
+    chroma sampling written to the file; fixed_point as for compress().
+    Returns the file bytes
+    (on the MPI backend: on rank 0, None elsewhere).
+    """
+    engine = get_backend(backend, **options)
+    if hasattr(engine, "encode_jpeg"):
+        # Distributed backends code their own intervals
+        return engine.encode_jpeg(image, quality, optimize, restart_rows, subsampling,
+                                  fixed_point)
+
+    Q_luma, Q_chroma = quant_tables(quality, 8)
+    h, w = image.shape[:2]
+    quantized = quantize_components(engine, image, Q_luma, Q_chroma, subsampling, fixed_point)
+    sampling = subsampling_factors(subsampling)
+
+    with phase("entropy"):
+        if workers and restart_rows:
+            with ThreadPoolExecutor(workers) as pool:
+                return write_jfif(h, w, *quantized, Q_luma, Q_chroma, optimize, restart_rows,
+                                  pool.map, sampling)
+        return write_jfif(h, w, *quantized, Q_luma, Q_chroma, optimize, restart_rows,
+                          sampling=sampling)
+
+
+def _load_on_root(engine, in_path, fixed_point):
+    # Distributed backends (MPI) take the image on rank 0 only, so the other
+    # ranks skip the full-frame decode
+    if getattr(engine, "rank", 0) != 0:
+        return None
+    with phase("load"):
+        return load_image(in_path, np.uint8 if fixed_point else np.float32)
+
+
+def encode_file(in_path, out_path, backend="numpy", quality=50, optimize=False,
+                restart_rows=0, workers=None, subsampling="4:4:4", fixed_point=False,
+                **options):
+    engine = get_backend(backend, **options)
+    image = _load_on_root(engine, in_path, fixed_point)
+    data = encode_jpeg(image, engine, quality, optimize, restart_rows, workers,
+                       subsampling, fixed_point)
+    if data is None:  # MPI rank other than 0
+        return None
+    out_path = Path(out_path)
+    with phase("save"):
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_bytes(data)
+    return out_path
+
+
+def compress_file(in_path, out_path, backend="numpy", block_size=8, quality=50,
+                  save_quality=75, subsampling="4:4:4", fixed_point=False, **options):
+    engine = get_backend(backend, **options)
+    image = _load_on_root(engine, in_path, fixed_point)
+    rgb = compress(image, engine, block_size, quality, subsampling, fixed_point)
+    if rgb is not None:  # None on MPI ranks other than 0
+        with phase("save"):
+            save_image(out_path, rgb, save_quality)
+    return rgb
+
+
+def compress_files(paths, out_dir, backend="numpy", block_size=8, quality=50,
+                   save_quality=75, suffix=".jpeg", subsampling="4:4:4", fixed_point=False,
+                   **options):
+    # Batch helper: the backend (and its JIT/OpenCL state) is built once
+    # and reused for every image in paths
+    out_dir = Path(out_dir)
+    paths = list(paths)
+    outputs = [out_dir / (Path(path).stem + suffix) for path in paths]
+    engine = get_backend(backend, **options)
+    if hasattr(engine, "compress_stream") and not fixed_point:
+        # Streaming backends run image i on the device while the next one is
+        # decoded here and the previous one is saved on the saver thread.
+        # At most two saves are pending, so a slow disk holds back the
+        # stream instead of piling up decoded frames in memory.
+        images = (load_image(path) for path in paths)
+        results = engine.compress_stream(images, block_size, quality, subsampling)
+        with ThreadPoolExecutor(1) as saver:
+            saved = []
+            for i, (out_path, rgb) in enumerate(zip(outputs, results)):
+                if i >= 2:
+                    saved[i - 2].result()  # re-raises save errors
+                saved.append(saver.submit(save_image, out_path, rgb, save_quality))
+            for future in saved[-2:]:
+                future.result()
+        return outputs
+    for path, out_path in zip(paths, outputs):
+        compress_file(path, out_path, engine, block_size, quality, save_quality,
+                      subsampling, fixed_point)
+    return outputs
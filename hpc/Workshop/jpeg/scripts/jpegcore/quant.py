@@ -0,0 +1,47 @@
+import numpy as np
+
+
+# ---------- Standard JPEG quantization tables (Annex K) ----------
+Q_Y = np.array([
+    [16,11,10,16,24,40,51,61],
+    [12,12,14,19,26,58,60,55],
+    [14,13,16,24,40,57,69,56],
+    [14,17,22,29,51,87,80,62],
+    [18,22,37,56,68,109,103,77],
+    [24,35,55,64,81,104,113,92],
+    [49,64,78,87,103,121,120,101],
+    [72,92,95,98,112,100,103,99]
+], dtype=np.float32)
+
+Q_C = np.array([
+    [17,18,24,47,99,99,99,99],
+    [18,21,26,66,99,99,99,99],
+    [24,26,56,99,99,99,99,99],
+    [47,66,99,99,99,99,99,99],
+    [99,99,99,99,99,99,99,99],
+    [99,99,99,99,99,99,99,99],
+    [99,99,99,99,99,99,99,99],
+    [99,99,99,99,99,99,99,99]
+], dtype=np.float32)
+
+
+def scale_quant_matrix(Q, quality):
+    # IJG quality scaling; quality=50 returns the base table unchanged
+    quality = max(1, min(100, quality))
+    if quality < 50:
+        scale = 5000 // quality
+    else:
+        scale = 200 - quality * 2
+    return np.clip((Q * scale + 50) // 100, 1, 255).astype(np.float32)
+
+
+def expand_quant_matrix(Q, block_size):
+    # Tile the 8x8 table so it covers a block_size x block_size block
+    reps = (block_size // Q.shape[0], block_size // Q.shape[1])
+    return np.tile(Q, reps)
+
+
+def quant_tables(quality=50, block_size=8):
+    Q_luma = expand_quant_matrix(scale_quant_matrix(Q_Y, quality), block_size)
+    Q_chroma = expand_quant_matrix(scale_quant_matrix(Q_C, quality), block_size)
+    return Q_luma, Q_chroma
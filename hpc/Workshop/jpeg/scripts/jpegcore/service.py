@@ -0,0 +1,203 @@
+import json
+import os
+import socket
+import time
+from pathlib import Path
+from queue import Empty
+
+from mpi4py import MPI
+
+from .farm import TAG_RESULT, TAG_STOP, TAG_TASK, process_file
+
+# Job descriptor fields: "path" (required), "out_dir", "encode", plus the
+# per-image settings below. {"stop": true} ends the session.
+COMPRESS_KEYS = {"quality", "block_size", "subsampling", "fixed_point", "save_quality"}
+ENCODE_KEYS = {"quality", "optimize", "restart_rows", "subsampling", "fixed_point"}
+
+
+def run_job(job, out_dir, encode=False, **options):
+    """Run one job descriptor; returns process_file() statistics plus "job",
+    or {"job": ..., "error": message} instead of raising, so that one bad
+    request cannot bring the pool down.
+    """
+    settings = dict(job)
+    try:
+        path = settings.pop("path")
+        out = settings.pop("out_dir", out_dir)
+        encode = settings.pop("encode", encode)
+        unknown = set(settings) - (ENCODE_KEYS if encode else COMPRESS_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown job fields {sorted(unknown)}")
+        stats = process_file(path, out, encode, **{**options, **settings})
+    except Exception as exc:  # reported back to rank 0
+        return {"job": job, "error": f"{type(exc).__name__}: {exc}"}
+    return dict(stats, job=job)
+
+
+def serve(jobs, out_dir, comm=None, encode=False, on_result=None, **options):
+    """Persistent worker pool: rank 0 hands each job of `jobs` to a free rank.
+
+    Every rank must call this; jobs only matters on rank 0. It is any
+    iterable of job descriptors (dicts), typically a blocking source such as
+    queue_jobs(), watch_directory() or socket_jobs(), so the ranks, their
+    imports and their cached backends stay up across requests and the
+    mpiexec startup is paid once per session. The session ends when the
+    source is exhausted or yields {"stop": true}. A source yields None as
+    an idle tick when no job arrived for a while, so that results finished
+    in the meantime are still collected; every result is passed to
+    on_result(stats) on rank 0 as it comes in.
+    Returns every result on rank 0, None elsewhere. options are the default
+    job settings (backend, quality, ...); a descriptor overrides them.
+    """
+    comm = comm if comm is not None else MPI.COMM_WORLD
+    rank, size = comm.Get_rank(), comm.Get_size()
+
+    if rank != 0:
+        status = MPI.Status()
+        while True:
+            job = comm.recv(source=0, tag=MPI.ANY_TAG, status=status)
+            if status.Get_tag() == TAG_STOP:
+                return None
+            stats = dict(run_job(job, out_dir, encode, **options), rank=rank)
+            comm.send(stats, dest=0, tag=TAG_RESULT)
+
+    results = []
+
+    def collect(stats):
+        results.append(stats)
+        if on_result is not None:
+            on_result(stats)
+
+    idle = list(range(1, size))
+    status = MPI.Status()
+
+    def receive():
+        collect(comm.recv(source=MPI.ANY_SOURCE, tag=TAG_RESULT, status=status))
+        idle.append(status.Get_source())
+
+    for job in jobs:
+        # Take in whatever finished while rank 0 waited for this job (or tick)
+        while size > 1 and comm.iprobe(source=MPI.ANY_SOURCE, tag=TAG_RESULT):
+            receive()
+        if job is None:
+            continue
+        if not isinstance(job, dict):
+            collect({"job": job, "error": "Job descriptor is not a JSON object", "rank": 0})
+            continue
+        if job.get("stop"):
+            break
+        if size == 1:
+            collect(dict(run_job(job, out_dir, encode, **options), rank=0))
+            continue
+        if not idle:
+            receive()
+        comm.send(job, dest=idle.pop(0), tag=TAG_TASK)
+
+    while len(idle) < size - 1:
+        receive()
+    for dest in range(1, size):
+        comm.send(None, dest=dest, tag=TAG_STOP)
+    return results
+
+
+# ---------- Job sources (rank 0) ----------
+# Each yields job descriptors, and None every poll_seconds without a job
+def parse_job(text, origin):
+    # Descriptor from one JSON text, or None (logged) if it is not a JSON object
+    try:
+        job = json.loads(text)
+    except json.JSONDecodeError as exc:
+        print(f"Skipping {origin}: {exc}")
+        return None
+    if not isinstance(job, dict):
+        print(f"Skipping {origin}: not a JSON object")
+        return None
+    return job
+
+
+def queue_jobs(queue, poll_seconds=0.5):
+    # Descriptors put on a queue.Queue by another thread; None ends the session
+    while True:
+        try:
+            job = queue.get(timeout=poll_seconds)
+        except Empty:
+            yield None
+            continue
+        if job is None:
+            return
+        yield job
+
+
+def watch_directory(directory, poll_seconds=0.5):
+    """Descriptors dropped into directory as *.json files, oldest first.
+
+    Each file is removed once read. Write descriptors under another suffix
+    and rename them to .json, so a half-written file is never picked up.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    while True:
+        found = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        if not found:
+            time.sleep(poll_seconds)
+            yield None
+            continue
+        for path in found:
+            job = parse_job(path.read_text(), path)
+            path.unlink()
+            if job is None:
+                continue
+            yield job
+            if job.get("stop"):
+                return
+
+
+def socket_jobs(path, poll_seconds=0.5):
+    # Descriptors sent as JSON lines over a Unix socket at path, any number
+    # per connection (see submit())
+    path = str(path)
+    if os.path.exists(path):
+        os.unlink(path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(path)
+        server.listen()
+        server.settimeout(poll_seconds)
+        try:
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    yield None
+                    continue
+                with conn:
+                    conn.settimeout(poll_seconds)
+                    pending = b""
+                    while True:
+                        try:
+                            data = conn.recv(65536)
+                        except socket.timeout:
+                            yield None
+                            continue
+                        *lines, pending = (pending + data).split(b"\n")
+                        if not data:  # closed: the last line needs no newline
+                            lines.append(pending)
+                        for line in lines:
+                            if not line.strip():
+                                continue
+                            job = parse_job(line.decode(errors="replace"), f"line {line[:40]!r}")
+                            if job is None:
+                                continue
+                            yield job
+                            if job.get("stop"):
+                                return
+                        if not data:
+                            break
+        finally:
+            os.unlink(path)
+
+
+def submit(path, jobs):
+    # Client side of socket_jobs(): send descriptors to a running service
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(path))
+        client.sendall("".join(json.dumps(job) + "\n" for job in jobs).encode())
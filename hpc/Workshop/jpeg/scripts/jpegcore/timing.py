@@ -0,0 +1,102 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+# Phases in report order; any other name is reported after these
+PHASES = ("load", "color", "resample", "pad", "dct", "entropy", "comm", "save")
+
+# Timer that phase() records into, None when timing is off
+_active = None
+
+
+class PhaseTimer:
+    """Seconds per pipeline phase on this process.
+
+    Use as a context manager to switch recording on: every phase() block
+    in the pipeline and the backends then adds its time here.
+
+        with PhaseTimer() as timer:
+            rgb = compress(image, "mpi")
+    """
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+
+    def __enter__(self):
+        global _active
+        self._previous, _active = _active, self
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = self._previous
+
+
+@contextmanager
+def phase(name):
+    # Time the block under `name` if a PhaseTimer is active; phases must
+    # not nest, or the inner time is counted twice
+    timer = _active
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.seconds[name] += time.perf_counter() - start
+
+
+def gather_phases(timer, comm):
+    # Every rank's {phase: seconds} on rank 0 (None elsewhere)
+    return comm.gather(dict(timer.seconds), root=0)
+
+
+def summarize_phases(records):
+    """min / mean / max seconds over ranks per phase, with the imbalance
+    factor max / mean (1.0 is perfectly balanced). A rank that never
+    entered a phase counts as 0 s.
+    """
+    names = [p for p in PHASES if any(p in r for r in records)]
+    names += sorted({p for r in records for p in r} - set(names))
+    summary = {}
+    for name in names:
+        values = [r.get(name, 0.0) for r in records]
+        mean = sum(values) / len(values)
+        summary[name] = {
+            "min": min(values),
+            "mean": mean,
+            "max": max(values),
+            "imbalance": max(values) / mean if mean else 1.0,
+        }
+    return summary
+
+
+def print_phases(summary):
+    print(f"{'phase':<10}{'min s':>10}{'mean s':>10}{'max s':>10}{'imbalance':>11}")
+    for name, s in summary.items():
+        print(f"{name:<10}{s['min']:>10.4f}{s['mean']:>10.4f}{s['max']:>10.4f}"
+              f"{s['imbalance']:>11.2f}")
+
+
+def dump_phases(path, records, summary):
+    # Per-rank records (indexed by rank) and the summary as JSON
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"ranks": records, "summary": summary}, indent=2))
+    return path
+
+
+def report_phases(timer, comm, json_path=None):
+    # Collective: reduce every rank's phases to rank 0, print them there and
+    # optionally dump JSON. Returns the summary on rank 0, None elsewhere.
+    records = gather_phases(timer, comm)
+    if records is None:
+        return None
+    summary = summarize_phases(records)
+    print_phases(summary)
+    if json_path:
+        dump_phases(json_path, records, summary)
+    return summary
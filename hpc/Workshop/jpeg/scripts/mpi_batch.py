@@ -0,0 +1,43 @@
+import sys
+import time
+from pathlib import Path
+
+from mpi4py import MPI
+
+from jpegcore.farm import farm_files, summarize
+from jpegcore.io import find_images
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+
+def main(in_dir=Path("images"), out_dir=Path("outputs/batch"), encode=False, backend="numpy"):
+    # Rank 0 lists the directory and hands out paths; each rank compresses
+    # whole files with its own backend, so no pixels are communicated
+    paths = find_images(in_dir) if rank == 0 else None
+    start = time.perf_counter()
+    results = farm_files(paths, out_dir, comm, encode, in_dir, backend=backend)
+
+    if rank == 0:
+        wall = time.perf_counter() - start
+        for r in results:
+            if "error" in r:
+                print(f"{r['path']}: FAILED {r['error']} (rank {r['rank']})")
+                continue
+            print(f"{r['path']}: {r['seconds']:.3f} s, {r['input_bytes']} -> "
+                  f"{r['output_bytes']} bytes (rank {r['rank']})")
+        stats = summarize(results, wall)
+        print(f"{stats['files']} files in {wall:.3f} s using {size} MPI processes: "
+              f"{stats['files_per_second']:.2f} files/s, mean {stats['mean_seconds']:.3f} s/file, "
+              f"compression ratio {stats['ratio']:.1f}")
+        if stats["failed"]:
+            print(f"{stats['failed']} files failed")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    main(Path(args[0]) if args else Path("images"),
+         Path(args[1]) if len(args) > 1 else Path("outputs/batch"),
+         encode="--encode" in sys.argv,
+         backend="numba" if "--numba" in sys.argv else "numpy")
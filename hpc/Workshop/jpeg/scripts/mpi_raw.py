@@ -1,154 +1,91 @@
-import numpy as np
-from matplotlib import pyplot as plt
-import rawpy  # Library to read raw images
-import time
-from mpi4py import MPI
+import sys
 from pathlib import Path
 
+from mpi4py import MPI
+
+from jpegcore import compress, encode_jpeg, get_backend, load_image, save_image
+from jpegcore.timing import PhaseTimer, phase, report_phases
+
 # Initialize MPI
 comm = MPI.COMM_WORLD
 rank = comm.Get_rank()
 size = comm.Get_size()
 
-# Start measuring total execution time (only on root)
-#if rank == 0:
- #   start_time = time.perf_counter()
-# ---------- Load image and convert to YCbCr ----------
-def load_raw_image(filename):
-    img_path = Path("images") / filename
-    raw = rawpy.imread(str(img_path))  # rawpy requires a string path
-    rgb = raw.postprocess()
-    return rgb.astype(np.float32)
-
-if rank == 0:
-    rgb = load_raw_image('image.nef')  # Use your .NEF file path here
-else:
-    rgb = None
-
-# Broadcast the image to all processes
-rgb = comm.bcast(rgb, root=0)
-
-# RGB to YCbCr conversion
-def rgb_to_ycbcr(image):
-    R = image[:, :, 0]
-    G = image[:, :, 1]
-    B = image[:, :, 2]
-    Y  =  0.299 * R + 0.587 * G + 0.114 * B
-    Cb = -0.168736 * R - 0.331264 * G + 0.5 * B + 128
-    Cr =  0.5 * R - 0.418688 * G - 0.081312 * B + 128
-    return Y, Cb, Cr
-
-# YCbCr to RGB conversion
-def ycbcr_to_rgb(Y, Cb, Cr):
-    R = Y + 1.402 * (Cr - 128)
-    G = Y - 0.344136 * (Cb - 128) - 0.714136 * (Cr - 128)
-    B = Y + 1.772 * (Cb - 128)
-    rgb = np.stack((R, G, B), axis=-1)
-    return np.clip(rgb, 0, 255).astype(np.uint8)
-
-Y, Cb, Cr = rgb_to_ycbcr(rgb)
-
-# Step 2: Pad images to multiples of 8
-def pad_image(image, block_size=8):
-    h, w = image.shape
-    pad_h = (block_size - h % block_size) % block_size
-    pad_w = (block_size - w % block_size) % block_size
-    padded = np.pad(image, ((0, pad_h), (0, pad_w)), mode='constant')
-    return padded, h, w
-
-Y_padded, orig_h, orig_w = pad_image(Y)
-Cb_padded, _, _ = pad_image(Cb)
-Cr_padded, _, _ = pad_image(Cr)
-
-# Step 3: Create DCT transformation matrix
-def dct_matrix(N=8):
-    C = np.zeros((N, N))
-    for k in range(N):
-        for n in range(N):
-            alpha = np.sqrt(1/N) if k == 0 else np.sqrt(2/N)
-            C[k, n] = alpha * np.cos(np.pi * (2*n + 1) * k / (2 * N))
-    return C
-
-C = dct_matrix(8)
 
-# Step 4: DCT and IDCT using matrix multiplication
-def dct_2d_vec(block):
-    return C @ block @ C.T
-
-def idct_2d_vec(block):
-    return C.T @ block @ C
-
-# Step 5: Standard JPEG quantization matrices
-Q_Y = np.array([
-    [16,11,10,16,24,40,51,61],
-    [12,12,14,19,26,58,60,55],
-    [14,13,16,24,40,57,69,56],
-    [14,17,22,29,51,87,80,62],
-    [18,22,37,56,68,109,103,77],
-    [24,35,55,64,81,104,113,92],
-    [49,64,78,87,103,121,120,101],
-    [72,92,95,98,112,100,103,99]
-])
-
-Q_C = np.array([
-    [17,18,24,47,99,99,99,99],
-    [18,21,26,66,99,99,99,99],
-    [24,26,56,99,99,99,99,99],
-    [47,66,99,99,99,99,99,99],
-    [99,99,99,99,99,99,99,99],
-    [99,99,99,99,99,99,99,99],
-    [99,99,99,99,99,99,99,99],
-    [99,99,99,99,99,99,99,99]
-])
-
-# Step 6: Process each channel in parallel
-def process_channel_parallel(channel, Q):
-    block_size = 8
-    h, w = channel.shape
-    compressed = np.zeros_like(channel)
-
-    # Divide rows among processes
-    rows_per_proc = h // size
-    start_row = rank * rows_per_proc
-    if rank == size - 1:
-        end_row = h  # last process takes the rest
+def flag_value(name, default=None):
+    # Value following `name` on the command line ("--threads 4"); default if
+    # the flag is absent or last, or followed by another flag
+    if name not in sys.argv:
+        return default
+    following = sys.argv[sys.argv.index(name) + 1:]
+    return following[0] if following and not following[0].startswith("--") else default
+
+
+def main(in_path=Path("images/image.nef"), out_path=Path("outputs/output_mpi_raw.jpeg"),
+         block_size=8, schedule="static", decomposition="rows", overlap_steps=0,
+         local="numpy", threads=None, shared=False):
+    # Only rank 0 reads the image; compress() scatters row bands to the others
+    with phase("load"):
+        rgb = load_image(in_path) if rank == 0 else None
+    # schedule="dynamic": rank 0 hands out stripes to the other ranks on demand;
+    # decomposition="tiles": 2-D Cartesian grid of tiles instead of row bands;
+    # overlap_steps: pipeline each band in sub-bands with Iscatterv/Igatherv;
+    # local/threads: per-rank kernel and its thread count (hybrid MPI + threads;
+    #   launch with "mpiexec --bind-to none", or each rank's threads share one core);
+    # shared: one copy of the frame per node in a shared-memory window
+    final_rgb = compress(rgb, backend="mpi", block_size=block_size, comm=comm,
+                         schedule=schedule, decomposition=decomposition,
+                         overlap_steps=overlap_steps, local=local, threads=threads,
+                         shared=shared)
+
+    if rank == 0:
+        print(f"Used {size} MPI processes" + (f" x {threads} threads" if threads else ""))
+        with phase("save"):
+            save_image(out_path, final_rgb)
+
+
+def main_mpiio(in_path=Path("images/image.nef"), encode=False):
+    # Parallel output: every rank writes its own stripes of the file with
+    # MPI-IO (a PPM of the compressed pixels, or the JPEG restart intervals)
+    with phase("load"):
+        rgb = load_image(in_path) if rank == 0 else None
+    backend = get_backend("mpi", comm=comm)
+    if encode:
+        backend.encode_to_file(Path("outputs/encoded_mpi_raw.jpg"), rgb)
     else:
-        end_row = (rank + 1) * rows_per_proc
-
-    # Process assigned rows
-    for i in range(start_row, end_row, block_size):
-        for j in range(0, w, block_size):
-            block = channel[i:i+block_size, j:j+block_size] - 128
-            dct_block = dct_2d_vec(block)
-            quantized = np.round(dct_block / Q)
-            dequantized = quantized * Q
-            idct_block = idct_2d_vec(dequantized) + 128
-            compressed[i:i+block_size, j:j+block_size] = idct_block
-
-    # Gather results from all processes
-    full_compressed = np.zeros_like(channel)
-    comm.Allreduce(compressed, full_compressed, op=MPI.SUM)
-    return full_compressed
-
-Y_compressed = process_channel_parallel(Y_padded, Q_Y)
-Cb_compressed = process_channel_parallel(Cb_padded, Q_C)
-Cr_compressed = process_channel_parallel(Cr_padded, Q_C)
-
-# Step 7: Crop back to original size (only root)
-if rank == 0:
-    Y_final = Y_compressed[:orig_h, :orig_w]
-    Cb_final = Cb_compressed[:orig_h, :orig_w]
-    Cr_final = Cr_compressed[:orig_h, :orig_w]
-
-    # Step 8: Convert back to RGB
-    final_rgb = ycbcr_to_rgb(Y_final, Cb_final, Cr_final)
-
-    # End time and print
-    #end_time = time.perf_counter()
-    #total_time = end_time - start_time
-    #print(f"Total Execution Time: {total_time:.3f} seconds")
-    print(f"Used {size} MPI processes")
-
-    # Save and show final image
-    out_path = Path("outputs/output_mpi_raw.jpeg")
-    plt.imsave(out_path, final_rgb.astype(np.uint8))
+        backend.compress_to_file(Path("outputs/output_mpi_raw.ppm"), rgb)
+    if rank == 0:
+        print(f"Used {size} MPI processes")
+
+
+def main_encode(in_path=Path("images/image.nef"), out_path=Path("outputs/encoded_mpi_raw.jpg"),
+                quality=50, restart_rows=0):
+    # Real JPEG output: each rank Huffman codes its own restart intervals
+    with phase("load"):
+        rgb = load_image(in_path) if rank == 0 else None
+    data = encode_jpeg(rgb, backend="mpi", quality=quality, restart_rows=restart_rows, comm=comm)
+
+    if rank == 0:
+        print(f"Used {size} MPI processes")
+        with phase("save"):
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            out_path.write_bytes(data)
+
+
+if __name__ == "__main__":
+    # --timing [FILE.json]: per-rank seconds per phase, reduced to rank 0 and
+    # printed as min/mean/max with the max/mean imbalance, optionally dumped
+    with PhaseTimer() as timer:
+        if "--mpiio" in sys.argv:
+            main_mpiio(encode="--encode" in sys.argv)
+        elif "--encode" in sys.argv:
+            main_encode()
+        else:
+            main(schedule="dynamic" if "--dynamic" in sys.argv else "static",
+                 decomposition="tiles" if "--tiles" in sys.argv else "rows",
+                 overlap_steps=4 if "--overlap" in sys.argv else 0,
+                 local="numba" if "--numba" in sys.argv else "numpy",
+                 threads=int(flag_value("--threads")) if "--threads" in sys.argv else None,
+                 shared="--shared" in sys.argv)
+    if "--timing" in sys.argv:
+        report_phases(timer, comm, flag_value("--timing"))
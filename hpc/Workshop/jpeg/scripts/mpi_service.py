@@ -0,0 +1,57 @@
+import sys
+import time
+from pathlib import Path
+
+from mpi4py import MPI
+
+from jpegcore.service import serve, socket_jobs, submit, watch_directory
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+
+def flag_value(name, default=None):
+    # Value following `name` on the command line ("--socket /tmp/jpeg.sock");
+    # default if the flag is absent or last, or followed by another flag
+    if name not in sys.argv:
+        return default
+    following = sys.argv[sys.argv.index(name) + 1:]
+    return following[0] if following and not following[0].startswith("--") else default
+
+
+def report(stats):
+    if "error" in stats:
+        print(f"{stats['job']}: {stats['error']} (rank {stats['rank']})", flush=True)
+    else:
+        print(f"{stats['path']} -> {stats['output']}: {stats['seconds']:.3f} s "
+              f"(rank {stats['rank']})", flush=True)
+
+
+def main(source="watch", where=Path("outputs/queue"), out_dir=Path("outputs/service"),
+         encode=False, backend="numpy"):
+    # Ranks stay up for the whole session: rank 0 reads job descriptors
+    # ({"path": ..., "quality": ..., "block_size": ...}) and hands them out
+    jobs = None
+    if rank == 0:
+        jobs = socket_jobs(where) if source == "socket" else watch_directory(where)
+        print(f"Serving {source} {where} with {size} MPI processes", flush=True)
+    start = time.perf_counter()
+    results = serve(jobs, out_dir, comm, encode, on_result=report, backend=backend)
+    if rank == 0:
+        print(f"{len(results)} jobs in {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    # Client: python scripts/mpi_service.py --submit SOCKET IMAGE... [--stop]
+    if "--submit" in sys.argv:
+        images = [a for a in sys.argv[sys.argv.index("--submit") + 2:] if not a.startswith("--")]
+        jobs = [{"path": str(Path(image).resolve())} for image in images]
+        submit(flag_value("--submit"), jobs + ([{"stop": True}] if "--stop" in sys.argv else []))
+    elif "--socket" in sys.argv:
+        main("socket", Path(flag_value("--socket")), encode="--encode" in sys.argv,
+             backend="numba" if "--numba" in sys.argv else "numpy")
+    else:
+        main("watch", Path(flag_value("--watch", "outputs/queue")),
+             encode="--encode" in sys.argv,
+             backend="numba" if "--numba" in sys.argv else "numpy")
@@ -0,0 +1,24 @@
+import sys
+import time
+from pathlib import Path
+
+from jpegcore import compress_files, find_images
+
+
+def main(in_dir=Path("images"), out_dir=Path("outputs/batch_opencl"), subsampling="4:4:4"):
+    # Streaming OpenCL batch: decoding of the next image, device work on the
+    # current one and saving of the previous one overlap
+    paths = find_images(in_dir)
+    start = time.perf_counter()
+    outputs = compress_files(paths, out_dir, backend="opencl", save_quality=85,
+                             subsampling=subsampling)
+    wall = time.perf_counter() - start
+    print(f"{len(outputs)} files in {wall:.3f} s "
+          f"({len(outputs) / wall if wall else 0.0:.2f} files/s) with OpenCL")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    main(Path(args[0]) if args else Path("images"),
+         Path(args[1]) if len(args) > 1 else Path("outputs/batch_opencl"),
+         "4:2:0" if "--420" in sys.argv else "4:4:4")